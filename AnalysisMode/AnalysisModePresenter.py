@@ -8,7 +8,17 @@ from Services.ForcastingService import ForcastingService
 from Services.VisualizationService import VisualizationService
 from Services.AnalysisService import AnalysisService
 from Services.CloudService import GoogleDriveService
+from Services.CacheService import DataCacheService
+from Services.LoadWorker import BackgroundLoader
+from Services.DatasetLoader import DatasetLoader
+from Services.JournalService import ChangeJournal
+from Services.ExportService import ExportService
+from Services.OutOfCoreService import OutOfCoreService
+from Services.FolderIngestService import FolderIngestService
+from Services.FilterService import FilteredDataset
+from Services.FilterExpression import FilterExpression
 from AnalysisMode.AnalysisModeView import AnalysisModeView
+from EditingMode.OsteoartritModel import apply_schema
 from PySide6.QtWidgets import (
     QVBoxLayout,
     QComboBox, QLabel, QPushButton, QListWidgetItem,
@@ -21,8 +31,9 @@ from matplotlib.backends.backend_qtagg import FigureCanvasQTAgg as FigureCanvas
 from matplotlib.figure import Figure
 from PySide6.QtCore import Qt
 from PySide6.QtWidgets import QSpinBox, QDialogButtonBox
-from PandasModel import PandasModel
+from PandasModel import PandasModel, fit_columns_to_sample
 from FilterDialog import FilterDialog
+from LoadOptionsDialog import LoadOptionsDialog
 from ModelSettingsDialog import ModelSettingsData, ModelSettingsView, ModelSettingsPresenter
 
 
@@ -64,22 +75,43 @@ class ClusterDialog(QDialog):
 class AnalysisModePresenter:
     def __init__(self, view: AnalysisModeView):
         self.view = view
-        self.data = None
-        self.original_data = None
+        self.data = None  # Создает self.dataset (данные с маской фильтра)
+        self.matrix = None  # MemmapMatrix в режиме работы с диска
+        self.pending_full_load = None  # (путь, столбцы), если загружен только предпросмотр
         self.model = None
+        self.cache_service = DataCacheService()
+        self.dataset_loader = DatasetLoader(cache_service=self.cache_service, schema=apply_schema)
+        self.loader = BackgroundLoader(self.view)
+        self.exporter = ExportService()
+        self.out_of_core = OutOfCoreService(self.cache_service)
+        self.folder_ingest = FolderIngestService()
         self.connect_signals()
         self.update_model_combo(self.view.task_type_combo.currentText())
         self.model_settings_data = ModelSettingsData()
 
+    @property
+    def data(self):
+        """Текущие данные с учетом фильтра; отфильтрованная копия создается только по запросу"""
+        return None if self.dataset is None else self.dataset.frame()
+
+    @data.setter
+    def data(self, value):
+        self.dataset = None if value is None else FilteredDataset(value)
+
     def connect_signals(self):
         """Подключение сигналов к слотам"""
         self.view.btn_load_local.clicked.connect(self.load_local_data)
+        self.view.btn_load_full.clicked.connect(self.load_full_data)
+        self.view.btn_load_out_of_core.clicked.connect(self.load_out_of_core)
+        self.view.btn_load_folder.clicked.connect(self.load_folder)
         self.view.btn_save_local.clicked.connect(self.save_local_data)
         self.view.btn_load_from_cloud.clicked.connect(self.load_data_from_cloud)
         self.view.btn_save_to_cloud.clicked.connect(self.save_data_to_cloud)
 
         self.view.btn_filter.clicked.connect(self.apply_filter)
         self.view.btn_reset_filter.clicked.connect(self.reset_filter)
+        self.view.btn_undo_filter.clicked.connect(self.undo_filter_step)
+        self.view.btn_remove_filter_step.clicked.connect(self.remove_filter_step)
 
         self.view.btn_refresh_stats.clicked.connect(self.show_stats)
         self.view.btn_save_stats.clicked.connect(self.save_stats)
@@ -102,58 +134,168 @@ class AnalysisModePresenter:
         """Загрузка данных из файла (Excel или CSV) с обновлением интерфейса"""
         file_path, _ = QFileDialog.getOpenFileName(
             self.view, "Открыть файл данных",
-            "", "Excel Files (*.xlsx *.xls);;CSV Files (*.csv)"
+            "", "Excel Files (*.xlsx *.xls);;CSV Files (*.csv);;SQLite (*.db *.sqlite)"
         )
         if not file_path:
             return  # Пользователь отменил выбор файла
 
+        # Проверка размера файла перед чтением
+        if os.path.getsize(file_path) == 0:
+            QMessageBox.critical(self.view, "Ошибка", "Ошибка: Файл пустой")
+            return
+
+        # Столбцы и строки выбираются до чтения, лишние данные в память не попадают
         try:
-            # Проверка размера файла перед чтением
-            if os.path.getsize(file_path) == 0:
-                raise ValueError("Выбранный файл пустой!")
-
-            if file_path.lower().endswith(('.xlsx', '.xls')):
-                # Чтение Excel файла
-                self.data = pd.read_excel(file_path)
-                # Дополнительная проверка для Excel
-                if self.data.empty:
-                    raise ValueError("Файл Excel не содержит данных")
-            elif file_path.lower().endswith('.csv'):
-                # Чтение CSV файла с автоматическим определением разделителя
-                self.data = pd.read_csv(file_path, encoding='utf-8-sig')
-                # Проверка для CSV (могли прочитать только заголовки)
-                if self.data.empty or len(self.data.columns) == 0:
-                    raise ValueError("CSV файл не содержит данных")
-            else:
-                raise ValueError("Неподдерживаемый формат файла")
+            columns = DatasetLoader.read_columns(file_path)
+        except Exception as e:
+            QMessageBox.critical(self.view, "Ошибка", f"Ошибка чтения файла:\n{str(e)}")
+            return
+        dialog = LoadOptionsDialog(columns, self.view)
+        if dialog.exec() != QDialog.Accepted:
+            return
+        options = dialog.get_options()
+        preview = options['nrows'] is not None or options['fraction'] is not None
+        full_load = (file_path, options['usecols']) if preview else None
+
+        # Разбор файла выполняется в фоновом потоке, интерфейс обновляется по завершении
+        self.loader.start(
+            self.dataset_loader.load, file_path,
+            on_finished=lambda data: self.on_data_loaded(data, file_path, full_load),
+            **options
+        )
+
+    def load_full_data(self):
+        """Догрузка всех строк файла, открытого в режиме предпросмотра"""
+        if self.pending_full_load is None:
+            return
+        file_path, usecols = self.pending_full_load
+        self.loader.start(
+            self.dataset_loader.load, file_path,
+            on_finished=lambda data: self.on_data_loaded(data, file_path),
+            usecols=usecols
+        )
+
+    def load_folder(self):
+        """Загрузка всех файлов врачей из папки в один набор данных"""
+        folder = QFileDialog.getExistingDirectory(self.view, "Выберите папку с файлами врачей")
+        if not folder:
+            return
+
+        self.loader.start(
+            self.folder_ingest.load_folder, folder,
+            on_finished=lambda result: self.on_folder_loaded(result, folder),
+            title="Загрузка папки..."
+        )
 
-            self.original_data = self.data.copy()
+    def on_folder_loaded(self, result, folder):
+        data, rejected = result
+        self.on_data_loaded(data, folder)
+        if rejected:
+            details = "\n".join(f"• {name}: {error}" for name, error in rejected.items())
+            QMessageBox.warning(self.view, "Пропущенные файлы",
+                                f"Файлы не соответствуют схеме данных и не загружены:\n{details}")
+
+    def load_out_of_core(self):
+        """Открытие большого файла без загрузки в память: числовые столбцы
+        один раз переводятся в матрицу на диске, расчеты идут порциями"""
+        file_path, _ = QFileDialog.getOpenFileName(
+            self.view, "Открыть файл данных",
+            "", "Excel Files (*.xlsx *.xls);;CSV Files (*.csv);;SQLite (*.db *.sqlite)"
+        )
+        if not file_path:
+            return
+
+        if os.path.getsize(file_path) == 0:
+            QMessageBox.critical(self.view, "Ошибка", "Ошибка: Файл пустой")
+            return
+
+        # Матрица строится из самого файла, журнал правок к ней не применяется
+        if ChangeJournal(file_path).exists():
+            reply = QMessageBox.question(
+                self.view, "Журнал изменений",
+                "У файла есть правки из режима редактирования, еще не объединенные с ним.\n"
+                "При работе с диска они не будут учтены. Продолжить?",
+                QMessageBox.Yes | QMessageBox.No)
+            if reply != QMessageBox.Yes:
+                return
+
+        self.loader.start(
+            self.out_of_core.open, file_path,
+            on_finished=lambda matrix: self.on_matrix_loaded(matrix, file_path),
+            title="Преобразование файла..."
+        )
+
+    def on_matrix_loaded(self, matrix, file_path):
+        """Обновление интерфейса после подготовки матрицы на диске"""
+        try:
+            self.matrix = matrix
+            self.set_pending_full_load(None)
+            # DataFrame поверх файла без копирования; исходные данные только для чтения
+            self.data = matrix.frame()
+            self.view.file_path_edit.setText(file_path)
+
+            model = PandasModel(self.data)
+            self.view.table_view.setModel(model)
+            self.view.table_view.setSortingEnabled(True)  # Сортировка не копирует данные, только перестановка
+            fit_columns_to_sample(self.view.table_view)
+
+            self.update_columns_list()
+            self.update_filter_steps()
+            self.show_stats()
+            self.update_prediction_combos()
+
+            QMessageBox.information(self.view, "Успех",
+                                    f"Файл открыт без загрузки в память\nСтрок: {len(matrix)}, "
+                                    f"числовых столбцов: {len(matrix.columns)}")
+        except Exception as e:
+            QMessageBox.critical(self.view, "Ошибка", f"Ошибка открытия файла:\n{str(e)}")
+
+    def analysis_data(self):
+        """Данные для сервисов: матрица на диске (с фильтром — только его строки)"""
+        if self.matrix is not None:
+            if self.dataset.is_filtered:
+                return self.matrix.select(self.dataset.rows())
+            return self.matrix
+        return self.data
+
+    def set_pending_full_load(self, full_load):
+        self.pending_full_load = full_load
+        self.view.btn_load_full.setEnabled(full_load is not None)
+
+    def on_data_loaded(self, data, file_path, full_load=None):
+        """Обновление интерфейса после завершения фоновой загрузки.
+
+        full_load — (путь, столбцы) для догрузки, если загружен предпросмотр.
+        """
+        try:
+            self.matrix = None
+            self.set_pending_full_load(full_load)
+            self.data = data
             self.view.file_path_edit.setText(file_path)
 
             # Инициализация таблицы данных
             model = PandasModel(self.data)
             self.view.table_view.setModel(model)
             self.view.table_view.setSortingEnabled(True)
-            self.view.table_view.resizeColumnsToContents()
+            fit_columns_to_sample(self.view.table_view)
 
             # Обновление интерфейса
             self.update_columns_list()
+            self.update_filter_steps()
             self.show_stats()
             self.update_prediction_combos()
 
-            QMessageBox.information(self.view, "Успех", f"Данные успешно загружены!\nЗагружено строк: {len(self.data)}")
+            message = f"Данные успешно загружены!\nЗагружено строк: {len(self.data)}"
+            if full_load is not None:
+                message += "\nЭто предпросмотр: нажмите «Загрузить полностью», чтобы прочитать все строки"
+            QMessageBox.information(self.view, "Успех", message)
 
-        except ValueError as e:
-            if "пустой" in str(e).lower():
-                QMessageBox.critical(self.view, "Ошибка", "Ошибка: Файл пустой")
-            else:
-                QMessageBox.critical(self.view, "Ошибка", f"Ошибка загрузки файла:\n{str(e)}")
         except Exception as e:
             QMessageBox.critical(self.view, "Ошибка", f"Ошибка загрузки файла:\n{str(e)}")
 
     def save_local_data(self):
         """Сохранение данных в файл"""
-        if self.data is None:
+        if self.dataset is None:
             QMessageBox.warning(self.view, "Ошибка", "Нет данных для сохранения!")
             return
 
@@ -162,31 +304,33 @@ class AnalysisModePresenter:
             "Excel Files (*.xlsx);;CSV Files (*.csv)"
         )
         if file_path:
-            try:
-                if file_path.endswith('.csv'):
-                    self.data.to_csv(file_path, index=False)
-                else:
-                    self.data.to_excel(file_path, index=False)
-                QMessageBox.information(self.view, "Успех", "Данные успешно сохранены!")
-            except Exception as e:
-                QMessageBox.critical(self.view, "Ошибка", f"Ошибка сохранения:\n{str(e)}")
+            self.loader.start(
+                self.exporter.write, self.data, file_path,
+                on_finished=lambda _: QMessageBox.information(self.view, "Успех", "Данные успешно сохранены!"),
+                on_error=lambda message: QMessageBox.critical(
+                    self.view, "Ошибка", f"Ошибка сохранения:\n{message}"),
+                title="Сохранение данных..."
+            )
 
     def load_data_from_cloud(self):
         """Загружает данные из Google Диска."""
         cloud_service = GoogleDriveService(parent_ui=self.view)
-        self.data, file, error = cloud_service.load_from_cloud()
+        self.data, file, error = cloud_service.load_from_cloud(self.dataset_loader)
 
         if error:
             QMessageBox.critical(self.view, "Ошибка", error)
         else:
+            self.matrix = None
+            self.set_pending_full_load(None)
             # Инициализация таблицы данных
             self.model = PandasModel(self.data)
             self.view.table_view.setModel(self.model)
             self.view.table_view.setSortingEnabled(True)
-            self.view.table_view.resizeColumnsToContents()
+            fit_columns_to_sample(self.view.table_view)
 
             # Обновление интерфейса
             self.update_columns_list()
+            self.update_filter_steps()
             self.show_stats()
             self.update_prediction_combos()
             self.view.file_path_edit.setText(file['name'])
@@ -194,7 +338,7 @@ class AnalysisModePresenter:
 
     def save_data_to_cloud(self):
         """Сохраняет данные в Google Диск."""
-        if self.data is None:
+        if self.dataset is None:
             QMessageBox.warning(self.view, "Ошибка", "Нет данных для сохранения!")
             return
 
@@ -207,11 +351,13 @@ class AnalysisModePresenter:
 
     def apply_filter(self):
         """Применение фильтра к данным"""
-        if self.data is None:
+        if self.dataset is None:
             QMessageBox.warning(self.view, "Ошибка", "Сначала загрузите данные!")
             return
 
-        dialog = FilterDialog(self.data.columns.tolist(), self.view)
+        dialog = FilterDialog(
+            self.dataset.columns.tolist(), self.view,
+            count_rows=lambda text: self.dataset.expression_count(FilterExpression(text)))
         if dialog.exec():
             filter_params = dialog.get_filter()
             try:
@@ -219,65 +365,85 @@ class AnalysisModePresenter:
                 operator = filter_params['operator']
                 value = filter_params['value']
 
-                # Сохраняем исходные данные для восстановления при пустом результате
-                filtered_data = self.data.copy()
-
-                if operator == "содержит":
-                    filtered_data = filtered_data[filtered_data[column].astype(str).str.contains(value, case=False)]
+                # Фильтр сужает маску строк, данные не копируются
+                timing = ""
+                if filter_params['expression']:
+                    expression = FilterExpression(filter_params['expression'])
+                    mask = self.dataset.expression_mask(expression)
+                    timing = f"\nВремя вычисления: {expression.elapsed * 1000:.1f} мс"
+                    description = filter_params['expression']
                 else:
-                    # Пробуем преобразовать значение в число
-                    try:
-                        value = float(value) if '.' in value else int(value)
-                    except ValueError:
-                        pass  # Оставляем как строку, если не число
-
-                    if operator == ">":
-                        filtered_data = filtered_data[filtered_data[column] > value]
-                    elif operator == ">=":
-                        filtered_data = filtered_data[filtered_data[column] >= value]
-                    elif operator == "==":
-                        filtered_data = filtered_data[filtered_data[column] == value]
-                    elif operator == "<=":
-                        filtered_data = filtered_data[filtered_data[column] <= value]
-                    elif operator == "<":
-                        filtered_data = filtered_data[filtered_data[column] < value]
-                    elif operator == "!=":
-                        filtered_data = filtered_data[filtered_data[column] != value]
+                    mask = self.dataset.condition_mask(column, operator, value)
+                    description = f"{column} {operator} {value}"
+                row_count = self.dataset.apply(mask, description)
 
                 # Проверка на пустой результат
-                if filtered_data.empty:
+                if not row_count:
                     QMessageBox.warning(self.view, "Ошибка", "Не найдено данных, удовлетворяющих условию")
                     return
 
-                # Применяем фильтр только если есть результаты
-                self.data = filtered_data
                 self.update_table_view()
+                self.update_filter_steps()
                 QMessageBox.information(self.view, "Успех",
-                                        f"Найдено строк: {len(self.data)}\nФильтр успешно применен!")
+                                        f"Найдено строк: {row_count}\nФильтр успешно применен!{timing}")
 
             except Exception as e:
                 QMessageBox.critical(self.view, "Ошибка", f"Ошибка применения фильтра:\n{str(e)}")
 
     def reset_filter(self):
         """Сброс фильтров и восстановление оригинальных данных"""
-        if self.original_data is not None:
-            self.data = self.original_data.copy()
+        if self.dataset is not None:
+            # Исходные данные не изменялись, достаточно сбросить маску
+            self.dataset.reset()
             self.update_table_view()
+            self.update_filter_steps()
             self.show_stats()
             QMessageBox.information(self.view, "Успех", "Фильтры сброшены!")
 
+    def undo_filter_step(self):
+        """Отмена последнего шага фильтра"""
+        if self.dataset is None or not self.dataset.steps:
+            QMessageBox.warning(self.view, "Ошибка", "Фильтр не применен!")
+            return
+        self.dataset.undo()
+        self.on_filter_steps_changed()
+
+    def remove_filter_step(self):
+        """Удаление выбранного шага фильтра; остальные шаги не пересчитываются"""
+        position = self.view.filter_steps_list.currentRow()
+        if self.dataset is None or not 0 <= position < len(self.dataset.steps):
+            QMessageBox.warning(self.view, "Ошибка", "Выберите шаг фильтра для удаления!")
+            return
+        self.dataset.remove_step(position)
+        self.on_filter_steps_changed()
+
+    def on_filter_steps_changed(self):
+        self.update_table_view()
+        self.update_filter_steps()
+        self.show_stats()
+
+    def update_filter_steps(self):
+        """Обновление списка шагов фильтра"""
+        self.view.filter_steps_list.clear()
+        if self.dataset is not None:
+            for description, mask in self.dataset.steps:
+                self.view.filter_steps_list.addItem(f"{description} ({int(np.count_nonzero(mask))})")
+
     def update_table_view(self):
         """Обновление табличного представления данных"""
-        if self.data is not None:
-            model = PandasModel(self.data)
-            self.view.table_view.setModel(model)
-            self.view.table_view.resizeColumnsToContents()
+        if self.dataset is not None:
+            model = self.view.table_view.model()
+            if isinstance(model, PandasModel):
+                model.set_rows(self.dataset.rows())
+            else:
+                self.view.table_view.setModel(PandasModel(self.dataset.base, rows=self.dataset.rows()))
+                fit_columns_to_sample(self.view.table_view)
 
     def update_columns_list(self):
         """Обновление списка столбцов"""
         self.view.columns_list.clear()
-        if self.data is not None:
-            for col in self.data.columns:
+        if self.dataset is not None:
+            for col in self.dataset.columns:
                 item = QListWidgetItem(col)
                 item.setFlags(item.flags() | Qt.ItemFlag.ItemIsUserCheckable)
                 item.setCheckState(Qt.CheckState.Unchecked)
@@ -285,14 +451,14 @@ class AnalysisModePresenter:
 
     def show_stats(self):
         """Отображение статистики данных в таблице на вкладке Статистика"""
-        if self.data is None:
+        if self.dataset is None:
             QMessageBox.warning(self.view, "Ошибка", "Сначала загрузите данные!")
             return
         try:
-            statistics = StatisticsService(self.data, self.view)
+            statistics = StatisticsService(self.analysis_data(), self.view)
             stats_df = statistics.get_statistics()
-            # Создаем модель для таблицы
-            model = PandasModel(stats_df)
+            # Создаем модель для таблицы: статистики — 6 значащих цифр вместо полной записи float64
+            model = PandasModel(stats_df, float_format='%.6g')
             self.view.stats_table.setModel(model)
             self.view.stats_table.resizeColumnsToContents()
         except Exception as e:
@@ -300,11 +466,11 @@ class AnalysisModePresenter:
 
     def save_stats(self):
         """Сохранение статистики в файл"""
-        if self.data is None:
+        if self.dataset is None:
             QMessageBox.warning(self.view, "Ошибка", "Нет данных для сохранения статистики!")
             return
         try:
-            statistics = StatisticsService(self.data, self.view)
+            statistics = StatisticsService(self.analysis_data(), self.view)
             stats_df = statistics.get_statistics()
             # Диалог сохранения файла
             file_path, _ = QFileDialog.getSaveFileName(
@@ -314,19 +480,14 @@ class AnalysisModePresenter:
                 "Excel Files (*.xlsx);;CSV Files (*.csv);;Text Files (*.txt)"
             )
             if file_path:
-                if file_path.endswith('.xlsx'):
-                    stats_df.to_excel(file_path)
-                elif file_path.endswith('.csv'):
-                    stats_df.to_csv(file_path)
-                else:
-                    stats_df.to_excel(file_path)
+                self.exporter.write(stats_df, file_path, index=True)
                 QMessageBox.information(self.view, "Успех", "Статистика успешно сохранена!")
 
         except Exception as e:
             QMessageBox.critical(self.view, "Ошибка", f"Ошибка сохранения статистики:\n{str(e)}")
 
     def plot_data(self):
-        if self.data is None:
+        if self.dataset is None:
             QMessageBox.warning(self.view, "Ошибка", "Сначала загрузите данные!")
             return
 
@@ -343,7 +504,7 @@ class AnalysisModePresenter:
         self.view.figure.clear()
 
         try:
-            visualization = VisualizationService(self.data, self.view)
+            visualization = VisualizationService(self.analysis_data(), self.view)
             visualization.set_canvas(self.view.canvas)  # Передаем canvas для отрисовки
             visualization.plot_data(selected_cols, plot_type)
 
@@ -352,7 +513,7 @@ class AnalysisModePresenter:
 
     def export_plots(self):
         """Экспорт графиков в файл"""
-        if self.data is None:
+        if self.dataset is None:
             QMessageBox.warning(self.view, "Ошибка", "Нет данных для экспорта!")
             return
 
@@ -377,11 +538,11 @@ class AnalysisModePresenter:
 
     def run_correlation_analysis(self):
         """Анализ корреляций (существующий метод)"""
-        if self.data is None:
+        if self.dataset is None:
             QMessageBox.warning(self.view, "Ошибка", "Сначала загрузите данные!")
             return
         try:
-            analysis = AnalysisService(self.data)
+            analysis = AnalysisService(self.analysis_data())
             report = analysis.get_correlation_analysis_report()
             self.view.analysis_text.setPlainText("\n".join(report))
             # Показываем тепловую карту
@@ -392,12 +553,12 @@ class AnalysisModePresenter:
 
     def run_distribution_analysis(self):
         """Анализ распределений данных"""
-        if self.data is None:
+        if self.dataset is None:
             QMessageBox.warning(self.view, "Ошибка", "Сначала загрузите данные!")
             return
 
         try:
-            analysis = AnalysisService(self.data)
+            analysis = AnalysisService(self.analysis_data())
             report = analysis.get_distribution_analysis_report()
 
             font = QFont("Courier New", 10)
@@ -410,12 +571,12 @@ class AnalysisModePresenter:
 
     def run_outliers_analysis(self):
         """Анализ выбросов в данных"""
-        if self.data is None:
+        if self.dataset is None:
             QMessageBox.warning(self.view, "Ошибка", "Сначала загрузите данные!")
             return
 
         try:
-            analysis = AnalysisService(self.data)
+            analysis = AnalysisService(self.analysis_data())
             report, outliers_count = analysis.get_outliers_analysis_report()
 
             self.view.analysis_text.setPlainText("\n".join(report))
@@ -428,19 +589,19 @@ class AnalysisModePresenter:
 
     def run_missing_data_analysis(self):
         """Анализ пропущенных значений"""
-        if self.data is None:
+        if self.dataset is None:
             QMessageBox.warning(self.view, "Ошибка", "Сначала загрузите данные!")
             return
 
         try:
-            analysis = AnalysisService(self.data)
+            analysis = AnalysisService(self.analysis_data())
             report = analysis.get_missing_data_analysis_report()
 
             # Визуализация пропусков
             self.view.figure.clear()
             ax = self.view.figure.add_subplot(111)
 
-            missing = self.data.isnull().sum()
+            missing = analysis.get_missing_counts()
             missing = missing[missing > 0]
             if not missing.empty:
                 missing.plot(kind='bar', ax=ax)
@@ -455,12 +616,12 @@ class AnalysisModePresenter:
 
     def run_cluster_analysis(self):
         """Кластерный анализ данных"""
-        if self.data is None:
+        if self.dataset is None:
             QMessageBox.warning(self.view, "Ошибка", "Сначала загрузите данные!")
             return
 
         try:
-            numeric_cols = self.data.select_dtypes(include=np.number).columns.tolist()
+            numeric_cols = self.dataset.base.select_dtypes(include=np.number).columns.tolist()
             if len(numeric_cols) < 2:
                 QMessageBox.warning(self.view, "Ошибка", "Недостаточно числовых признаков для кластеризации!")
                 return
@@ -613,7 +774,7 @@ class AnalysisModePresenter:
 
     def train_model(self):
         """Модифицированный метод обучения модели"""
-        if self.data is None:
+        if self.dataset is None:
             QMessageBox.warning(self.view, "Ошибка", "Сначала загрузите данные!")
             return
 
@@ -706,7 +867,7 @@ class AnalysisModePresenter:
 
     def on_target_changed(self):
         """Обработчик изменения целевой переменной"""
-        if hasattr(self, 'data') and self.data is not None:
+        if getattr(self, 'dataset', None) is not None:
             self.update_input_fields()
             self.view.select_all_checkbox.setChecked(False)
 
@@ -776,7 +937,7 @@ class AnalysisModePresenter:
 
     def update_prediction_combos(self):
         """Обновление списка доступных признаков"""
-        if self.data is None:
+        if self.dataset is None:
             return
 
         # Блокируем сигналы во избежание рекурсии
@@ -785,7 +946,7 @@ class AnalysisModePresenter:
         current_target = self.view.target_combo.currentText()
         self.view.target_combo.clear()
 
-        numeric_cols = self.data.select_dtypes(include=np.number).columns.tolist()
+        numeric_cols = self.dataset.base.select_dtypes(include=np.number).columns.tolist()
         self.view.target_combo.addItems(numeric_cols)
 
         if current_target in numeric_cols:
@@ -806,11 +967,11 @@ class AnalysisModePresenter:
 
         self.feature_widgets = {}
 
-        if self.data is None or not self.view.target_combo.currentText():
+        if self.dataset is None or not self.view.target_combo.currentText():
             return
 
         target = self.view.target_combo.currentText()
-        numeric_cols = self.data.select_dtypes(include=np.number).columns.tolist()
+        numeric_cols = self.dataset.base.select_dtypes(include=np.number).columns.tolist()
         features = [col for col in numeric_cols if col != target]
 
         # Настройки сетки - 4 колонки: чекбокс, название, значение
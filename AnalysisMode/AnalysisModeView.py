@@ -26,11 +26,18 @@ class AnalysisModeView(QMainWindow):
         # Элементы на левой панели
         self.file_path_edit = QLineEdit()
         self.btn_load_local = QPushButton("Загрузить данные")
+        self.btn_load_out_of_core = QPushButton("Открыть без загрузки в память")
+        self.btn_load_folder = QPushButton("Загрузить папку")
+        self.btn_load_full = QPushButton("Загрузить полностью")
+        self.btn_load_full.setEnabled(False)  # Доступна после загрузки предпросмотра
         self.btn_save_local = QPushButton("Сохранить данные")
         self.btn_load_from_cloud = QPushButton("Загрузить из облака")
         self.btn_save_to_cloud = QPushButton("Сохранить в облако")
         self.btn_filter = QPushButton("Фильтровать данные")
         self.btn_reset_filter = QPushButton("Сбросить фильтр")
+        self.filter_steps_list = QListWidget()  # Примененные шаги фильтра
+        self.btn_undo_filter = QPushButton("Отменить последний шаг")
+        self.btn_remove_filter_step = QPushButton("Удалить выбранный шаг")
         self.columns_list = QListWidget()
 
         # Вкладки
@@ -108,6 +115,9 @@ class AnalysisModeView(QMainWindow):
         layout_actions.addWidget(QLabel("Путь к файлу:"))
         layout_actions.addWidget(self.file_path_edit)
         layout_actions.addWidget(self.btn_load_local)
+        layout_actions.addWidget(self.btn_load_full)
+        layout_actions.addWidget(self.btn_load_out_of_core)
+        layout_actions.addWidget(self.btn_load_folder)
         layout_actions.addWidget(self.btn_save_local)
         layout_actions.addWidget(self.btn_load_from_cloud)
         layout_actions.addWidget(self.btn_save_to_cloud)
@@ -117,6 +127,9 @@ class AnalysisModeView(QMainWindow):
         group_filter = QGroupBox("Фильтрация")
         layout_filter = QVBoxLayout(group_filter)
         layout_filter.addWidget(self.btn_filter)
+        layout_filter.addWidget(self.filter_steps_list)
+        layout_filter.addWidget(self.btn_undo_filter)
+        layout_filter.addWidget(self.btn_remove_filter_step)
         layout_filter.addWidget(self.btn_reset_filter)
         left_layout.addWidget(group_filter)
 
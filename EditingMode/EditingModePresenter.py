@@ -1,12 +1,22 @@
 from EditingMode.EditingModeView import EditingModeView
-from EditingMode.OsteoartritModel import OsteoartritModel
+from EditingMode.OsteoartritModel import OsteoartritModel, apply_schema
 from Services.CloudService import GoogleDriveService
+from Services.LoadWorker import BackgroundLoader
+from Services.DatasetLoader import DatasetLoader
+from Services.ScoringService import ScoringService
+from Services.JournalService import ChangeJournal
+from Services.ExportService import ExportService
+from Services.AutosaveService import AutosaveService, AUTOSAVE_INTERVAL_MS
+from Services.SqliteStorage import SqliteStorage
+from OsteoartritTableModel import OsteoartritTableModel
 from PySide6.QtWidgets import (QListWidgetItem, QTableWidget, QTableWidgetItem, QDialogButtonBox,
                                QFileDialog, QMessageBox, QDialog, QFormLayout, QTextEdit,
                                QLineEdit, QComboBox, QInputDialog, QVBoxLayout, QLabel)
-from PySide6.QtCore import Qt
+from PySide6.QtCore import Qt, QTimer
+from PySide6.QtGui import QFont
 import pandas as pd
 import os
+import time
 
 
 class EditingModePresenter:
@@ -14,12 +24,28 @@ class EditingModePresenter:
         self.view = view
         self.model = model
         self.current_file = None
+        self.journal = None
         self.current_record_index = -1  # -1 means new record
         self.current_page = 0
+        # Журнал применяется к модели при загрузке, чтобы его можно было объединить с файлом
+        self.dataset_loader = DatasetLoader(schema=apply_schema, replay_journal=False)
+        self.scoring = ScoringService()
+        self.exporter = ExportService()
+        self.loader = BackgroundLoader(self.view)
+        self.autosave = AutosaveService(f"user_{self.view.current_user.get('ID', 1)}")
+        self.autosave_timer = QTimer(self.view)
+        self.autosave_timer.setInterval(AUTOSAVE_INTERVAL_MS)
+        self.autosave_timer.timeout.connect(
+            lambda: self.autosave.maybe_save(self.model, self.current_file, force=True))
+        self.table_model = OsteoartritTableModel(self.model)
         self.connect_signals()
         # Initialize view
-        self.view.update_table(self.model.df)
+        self.view.set_table_model(self.table_model)
+        self.refresh_table()
         self.update_columns_list()
+        self.autosave_timer.start()
+        # Предлагаем восстановление после того, как окно будет показано
+        QTimer.singleShot(0, self.offer_autosave_recovery)
         pd.set_option('display.float_format', '{:.0f}'.format)  # Убирает .0 для float
 
     def connect_signals(self):
@@ -28,12 +54,16 @@ class EditingModePresenter:
         self.view.btn_load_from_cloud.clicked.connect(self.load_data_from_cloud)
         self.view.btn_save_to_cloud.clicked.connect(self.save_data_to_cloud)
         self.view.btn_save_as.clicked.connect(self.save_data_as)
+        self.view.btn_compact.clicked.connect(self.compact_journal)
+        self.view.closing.connect(self.on_view_closing)
 
         self.view.btn_add_row.clicked.connect(self.add_row)
         self.view.btn_edit_row.clicked.connect(self.edit_row)
         self.view.btn_delete_row.clicked.connect(self.delete_row)
+        self.view.btn_recompute.clicked.connect(self.recompute_derived_fields)
 
         self.view.about_action.triggered.connect(self.show_about)
+        self.view.memory_report_action.triggered.connect(self.show_memory_report)
         self.view.analysis_action.triggered.connect(self.open_analysis_mode)
 
         self.view.next_button.clicked.connect(self.next_page)
@@ -58,7 +88,7 @@ class EditingModePresenter:
         self.current_page = 0
         self.view.dialog.setWindowTitle("Редактирование записи")
         # Get data from model
-        record = self.model.df.iloc[row]
+        record = self.model.get_row(row)
 
         # Convert to input format
         values = {
@@ -110,8 +140,32 @@ class EditingModePresenter:
         )
 
         if reply == QMessageBox.Yes:
-            self.model.delete_row(row)
-            self.view.update_table(self.model.df)
+            self.table_model.delete_row(row)
+            self.autosave.maybe_save(self.model, self.current_file)
+
+    def recompute_derived_fields(self):
+        """Пересчет ИМТ, ГМС, суммы баллов и ДСТ для всех записей"""
+        if self.model.row_count() == 0:
+            QMessageBox.warning(self.view, "Ошибка", "Нет данных для пересчета!")
+            return
+
+        try:
+            changed_rows = self.model.recompute_derived(self.scoring)
+        except KeyError as e:
+            QMessageBox.critical(self.view, "Ошибка", f"Не удалось пересчитать поля:\n{str(e)}")
+            return
+
+        self.refresh_table()
+        self.autosave.maybe_save(self.model, self.current_file, force=True)
+        if len(changed_rows) == 0:
+            QMessageBox.information(self.view, "Успех", "Все вычисляемые поля уже актуальны")
+            return
+
+        shown = ", ".join(str(row + 1) for row in changed_rows[:20])
+        if len(changed_rows) > 20:
+            shown += ", ..."
+        QMessageBox.information(self.view, "Успех",
+                                f"Пересчитано записей: {len(changed_rows)}\nИзмененные строки: {shown}")
 
     def center_dialog(self):
         # Получаем геометрию главного окна
@@ -234,76 +288,11 @@ class EditingModePresenter:
             gms_light = 1 if gms2 == 2 else 0
             gms_expressed = 1 if gms2 == 3 else 0
 
-            feature_scores = {
-                "bmi_under_25": 1,
-                "skin_light": 2,
-                "skin_heavy": 2,
-                "keloid": 2,
-                "striae": 2,
-                "hemorrhages": 2,
-                "hernias": 3,
-                "ptosis": 3,
-                "tmj": 2,
-                "periodontosis": 1,
-                "dolicho": 3,
-                "gms_light": 2,
-                "gms_expressed": 3,
-                "kyphosis": 2,
-                "chest": 3,
-                "flatfeet": 2,
-                "valgus": 1,
-                "joint": 1,
-                "mvp": 2,
-                "varicose_light": 2,
-                "varicose_heavy": 3,
-                "myopia_light": 1,
-                "myopia_heavy": 2,
-                "gallbladder": 2,
-                "gerd": 2,
-                "hypotension": 1,
-            }
-
-            # Sum of binary features (excluding disease, age, sum, bmi, gms, gms2)
-            binary_features = [
-                bmi_under_25,
-                int(values["skin_light"]),
-                int(values["skin_heavy"]),
-                int(values["keloid"]),
-                int(values["striae"]),
-                int(values["hemorrhages"]),
-                int(values["hernias"]),
-                int(values["ptosis"]),
-                int(values["tmj"]),
-                int(values["periodontosis"]),
-                int(values["dolicho"]),
-                gms_light,
-                gms_expressed,
-                int(values["kyphosis"]),
-                int(values["chest"]),
-                int(values["flatfeet"]),
-                int(values["valgus"]),
-                int(values["joint"]),
-                int(values["mvp"]),
-                int(values["varicose_light"]),
-                int(values["varicose_heavy"]),
-                int(values["myopia_light"]),
-                int(values["myopia_heavy"]),
-                int(values["gallbladder"]),
-                int(values["gerd"]),
-                int(values["hypotension"]),
-            ]
-
-            feature_sum = sum(
-                feature * feature_scores[feature_name]
-                for feature, feature_name in zip(binary_features, feature_scores.keys())
-            )
-            disease = 1 if feature_sum >= 8 else 0
-
             # Create record
             record = [
                 doctor_id,
-                disease,  # Болезнь
-                feature_sum,  # Сумма
+                0,  # Болезнь (рассчитывается ниже)
+                0,  # Сумма (рассчитывается ниже)
                 age,  # Возраст
                 height,
                 weight,
@@ -338,14 +327,20 @@ class EditingModePresenter:
                 int(values["hypotension"]),  # Гипотенз
             ]
 
+            # Сумма баллов и ДСТ считаются общим векторным движком
+            scores, dst = self.scoring.score_frame(pd.DataFrame([record], columns=self.model.columns))
+            feature_sum, disease = int(scores[0]), int(dst[0])
+            record[1], record[2] = disease, feature_sum
+
             # Add or update record
+            # Модель таблицы обновляет в представлении только затронутую строку
             if self.current_record_index == -1:
-                self.model.add_row(record)
+                self.table_model.add_row(record)
             else:
-                self.model.update_row(self.current_record_index, record)
+                self.table_model.update_row(self.current_record_index, record)
 
-            self.view.update_table(self.model.df)
             self.view.dialog.close()
+            self.autosave.maybe_save(self.model, self.current_file)
             self.view.show_msg(f"Данные успешно сохранены!\nЗначение суммы равно {feature_sum}"
                                f"\nЗначение болезни - {'да' if disease == 1 else 'нет'}")
 
@@ -355,124 +350,261 @@ class EditingModePresenter:
     def update_columns_list(self):
         """Обновление списка столбцов"""
         self.view.columns_list.clear()
-        if self.model.df is not None:
-            for col in self.model.df.columns:
-                item = QListWidgetItem(col)
-                self.view.columns_list.addItem(item)
+        for col in self.model.columns:
+            item = QListWidgetItem(col)
+            self.view.columns_list.addItem(item)
+
+    def refresh_table(self):
+        """Полное обновление таблицы; записи из базы SQLite читаются страницами"""
+        self.table_model.refresh()
 
     def load_local_data(self):
         """Загрузка Excel файла"""
         file_path, _ = QFileDialog.getOpenFileName(
             self.view, "Открыть файл данных",
-            "", "Excel Files (*.xlsx *.xls);;CSV Files (*.csv)"
+            "", "Excel Files (*.xlsx *.xls);;CSV Files (*.csv);;SQLite (*.db *.sqlite)"
         )
         if not file_path:
             return  # Пользователь отменил выбор файла
 
+        # Проверка размера файла перед чтением
+        if os.path.getsize(file_path) == 0:
+            QMessageBox.critical(self.view, "Ошибка", "Не удалось загрузить файл:\nФайл пустой")
+            return
+
+        if SqliteStorage.is_sqlite_file(file_path):
+            self.open_storage_file(file_path)
+            return
+
+        # Разбор файла выполняется в фоновом потоке, таблица обновляется по завершении
+        self.loader.start(
+            self.dataset_loader.load, file_path,
+            on_finished=lambda df: self.on_data_loaded(df, file_path),
+            on_error=lambda message: QMessageBox.critical(
+                self.view, "Ошибка", f"Не удалось загрузить файл:\n{message}")
+        )
+
+    def open_storage_file(self, file_path):
+        """Открытие базы SQLite: записи не загружаются в память целиком"""
         try:
-            # Проверка размера файла перед чтением
-            if os.path.getsize(file_path) == 0:
-                raise ValueError("Файл пустой")
-
-            if file_path.lower().endswith(('.xlsx', '.xls')):
-                # Чтение Excel файла
-                self.data = pd.read_excel(file_path, dtype={'Возраст': 'int64'})
-                # Дополнительная проверка для Excel
-                if self.data.empty:
-                    raise ValueError("Файл Excel не содержит данных")
-            elif file_path.lower().endswith('.csv'):
-                # Чтение CSV файла с автоматическим определением разделителя
-                self.data = pd.read_csv(file_path, encoding='utf-8-sig', dtype={'Возраст': 'int64'})
-                # Проверка для CSV (могли прочитать только заголовки)
-                if self.data.empty or len(self.data.columns) == 0:
-                    raise ValueError("CSV файл не содержит данных")
-
-            if file_path.lower().endswith(('.xlsx', '.xls')):
-                # Чтение Excel файла
-                self.model.df = pd.read_excel(file_path)
-                pd.set_option('display.float_format', '{:.0f}'.format)  # Убирает .0 для float
-            elif file_path.lower().endswith('.csv'):
-                # Чтение CSV файла с автоматическим определением разделителя
-                self.model.df = pd.read_csv(file_path, encoding='utf-8-sig')
-                pd.set_option('display.float_format', '{:.0f}'.format)  # Убирает .0 для float
-            else:
-                pass
+            self.model.open_storage(SqliteStorage(file_path))
+        except Exception as e:
+            QMessageBox.critical(self.view, "Ошибка", f"Не удалось открыть базу данных:\n{str(e)}")
+            return
+
+        self.autosave.discard()
+        self.journal = None  # Правки сразу записываются в базу
+        self.current_file = file_path
+        self.view.file_path_edit.setText(file_path)
+        self.refresh_table()
+        self.update_columns_list()
+        QMessageBox.information(self.view, "Успех", f"База данных открыта, записей: {self.model.row_count()}")
+
+    def on_data_loaded(self, df, file_path):
+        """Обновление интерфейса после завершения фоновой загрузки"""
+        try:
+            self.model.close_storage(keep_data=False)
+            self.model.df = df
+            self.model.reset_changes()
+            self.autosave.discard()
+            pd.set_option('display.float_format', '{:.0f}'.format)  # Убирает .0 для float
+
+            # Правки, сохраненные в журнал после последнего объединения
+            self.journal = ChangeJournal(file_path)
+            replayed = self.journal.replay(self.model)
 
             self.view.file_path_edit.setText(file_path)
             self.current_file = file_path
-            self.view.update_table(self.model.df)
+            self.refresh_table()
             self.update_columns_list()
 
-            self.model.df['Возраст'] = self.model.df['Возраст'].astype('int64')
-
-            QMessageBox.information(self.view, "Успех", "Файл успешно загружен")
+            message = "Файл успешно загружен"
+            if replayed:
+                message += f"\nПрименено изменений из журнала: {replayed}"
+            QMessageBox.information(self.view, "Успех", message)
 
         except Exception as e:
             QMessageBox.critical(self.view, "Ошибка", f"Не удалось загрузить файл:\n{str(e)}")
 
     def save_data_as(self):
         """Сохранение данных в файл"""
-        if self.model.df.empty:
+        if self.model.row_count() == 0:
             QMessageBox.warning(self.view, "Ошибка", "Нет данных для сохранения!")
             return
 
         file_path, _ = QFileDialog.getSaveFileName(
             self.view, "Сохранить данные", "",
-            "Excel Files (*.xlsx);;CSV Files (*.csv)"
+            "Excel Files (*.xlsx);;CSV Files (*.csv);;SQLite (*.db *.sqlite)"
         )
-        if file_path:
-            try:
-                if self.model.df is None or self.model.df.empty:
-                    raise ValueError("Нет данных для сохранения!")
-                if file_path.endswith('.csv'):
-                    self.model.df.to_csv(file_path, index=False)
-                else:
-                    self.model.df.to_excel(file_path, index=False)
-                QMessageBox.information(self.view, "Успех", "Данные успешно сохранены!")
-            except Exception as e:
-                QMessageBox.critical(self.view, "Ошибка", f"Ошибка сохранения:\n{str(e)}")
+        if not file_path:
+            return
+
+        if file_path.endswith(('.db', '.sqlite')):
+            if self.model.storage is not None and os.path.abspath(file_path) == os.path.abspath(self.current_file):
+                QMessageBox.information(self.view, "Успех", "Данные уже хранятся в этой базе")
+                return
+            # Импорт текущих данных в новую базу SQLite
+            frame, _ = self.model.snapshot()
+            self.loader.start(
+                SqliteStorage.write_frame, frame, file_path,
+                on_finished=lambda _: QMessageBox.information(self.view, "Успех", "База данных сохранена!"),
+                on_error=lambda message: QMessageBox.critical(
+                    self.view, "Ошибка", f"Ошибка сохранения:\n{message}"),
+                title="Сохранение данных..."
+            )
+        else:
+            self.write_data_file(
+                file_path,
+                lambda mark: QMessageBox.information(self.view, "Успех", "Данные успешно сохранены!")
+            )
 
     def save_local_data(self):
         """Сохранение данных в Excel"""
-        if self.model.df is None or self.model.df.empty:
+        if self.model.row_count() == 0:
             QMessageBox.warning(self.view, "Ошибка", "Нет данных для сохранения!")
             return
 
-        if self.current_file:
-            try:
-                if self.model.df is None or self.model.df.empty:
-                    raise ValueError("Нет данных для сохранения!")
-                if self.current_file.endswith('.csv'):
-                    self.model.df.to_csv(self.current_file, index=False)
-                else:
-                    self.model.df.to_excel(self.current_file, index=False)
-
-                QMessageBox.information(self.view, "Успех", "Данные успешно сохранены!")
-            except Exception as e:
-                QMessageBox.critical(self.view, "Ошибка", f"Ошибка сохранения:\n{str(e)}")
-        else:
+        if self.model.storage is not None:
+            QMessageBox.information(self.view, "Успех", "Изменения сохраняются в базу данных автоматически")
+            return
+
+        if not self.current_file:
             self.save_data_as()
+            return
+
+        if self.model.needs_full_save:
+            # Массовые изменения не журналируются, перезаписываем файл целиком
+            self.write_data_file(
+                self.current_file,
+                lambda mark: self.on_full_save_done("Данные успешно сохранены!", mark)
+            )
+            return
+
+        try:
+            # Дописываем в журнал только новые правки
+            self.journal.append(self.model.pending_changes)
+            self.model.reset_changes()
+            self.autosave.discard()
+            QMessageBox.information(self.view, "Успех", "Данные успешно сохранены!")
+        except Exception as e:
+            QMessageBox.critical(self.view, "Ошибка", f"Ошибка сохранения:\n{str(e)}")
+
+    def compact_journal(self):
+        """Объединение журнала изменений с основным файлом"""
+        if not self.current_file:
+            QMessageBox.warning(self.view, "Ошибка", "Файл данных не выбран!")
+            return
+        if self.journal is None:
+            QMessageBox.information(self.view, "Успех", "Журнал изменений для этих данных не ведется")
+            return
+
+        self.write_data_file(
+            self.current_file,
+            lambda mark: self.on_full_save_done("Журнал изменений объединен с файлом!", mark)
+        )
+
+    def on_full_save_done(self, message, mark):
+        """Файл перезаписан целиком, журнал больше не нужен.
+
+        mark — отметка model.snapshot() записанных данных: правки, сделанные
+        во время записи, в файл не попали и остаются несохраненными.
+        """
+        try:
+            self.journal.clear()
+        except OSError as e:
+            QMessageBox.warning(self.view, "Ошибка", f"Не удалось удалить журнал изменений:\n{str(e)}")
+            return
+        self.model.mark_saved(mark)
+        if self.model.is_dirty():
+            message += "\nИзменения, сделанные во время записи, пока не сохранены"
+        else:
+            self.autosave.discard()
+        QMessageBox.information(self.view, "Успех", message)
+
+    def on_view_closing(self):
+        """При выходе сохраненный журнал объединяется с основным файлом"""
+        self.autosave_timer.stop()
+        self.autosave.wait()
+        self.model.close_storage(keep_data=False)
+        if self.model.is_dirty():
+            # Несохраненные правки не записываем в файл без ведома пользователя,
+            # они останутся в автосохранении до следующего запуска
+            self.autosave.save_now(self.model, self.current_file)
+            return
+        self.autosave.discard()
+        if self.journal is None or not self.journal.exists():
+            return
+        try:
+            # Окно уже закрывается, поэтому пишем без фонового потока
+            self.exporter.write(self.model.df, self.current_file)
+            self.journal.clear()
+        except Exception as e:
+            print(f"Ошибка объединения журнала: {e}")
+
+    def write_data_file(self, file_path, on_saved):
+        """Полная потоковая запись данных модели в фоне с окном прогресса.
+
+        Пишется копия данных на момент вызова: окно мастера остается доступным,
+        и правки во время записи не должны менять записываемую таблицу.
+        on_saved получает отметку записанного состояния (model.snapshot()).
+        """
+        frame, mark = self.model.snapshot()
+        self.loader.start(
+            self.exporter.write, frame, file_path,
+            on_finished=lambda _: on_saved(mark),
+            on_error=lambda message: QMessageBox.critical(
+                self.view, "Ошибка", f"Ошибка сохранения:\n{message}"),
+            title="Сохранение данных..."
+        )
 
     def load_data_from_cloud(self):
         """Загружает данные из Google Диска."""
         cloud_service = GoogleDriveService(parent_ui=self.view)
 
-        df, file, error = cloud_service.load_from_cloud()
+        df, file, error = cloud_service.load_from_cloud(self.dataset_loader)
         pd.set_option('display.float_format', '{:.0f}'.format)  # Убирает .0 для float
         if error or df is None:
             QMessageBox.critical(self.view, "Ошибка", error)
         else:
             # Обновление интерфейса
+            self.model.close_storage(keep_data=False)
             self.model.df = df
-            df['Возраст'] = df['Возраст'].astype('int64')
-            self.view.update_table(self.model.df)
+            self.model.reset_changes()
+            self.autosave.discard()
+            self.current_file = None
+            self.journal = None
+            self.refresh_table()
             self.update_columns_list()
             self.view.file_path_edit.setText(file['name'])
             QMessageBox.information(self.view, "Успех", "Файл успешно загружен")
 
+    def offer_autosave_recovery(self):
+        """Восстановление данных, не сохраненных до аварийного завершения"""
+        snapshot = self.autosave.load()
+        if snapshot is None:
+            return
+
+        source = snapshot['source'] or "данные без файла"
+        saved_at = time.strftime('%d.%m.%Y %H:%M', time.localtime(snapshot['saved_at']))
+        reply = QMessageBox.question(
+            self.view, "Восстановление",
+            f"Найдены несохраненные изменения ({source}, {saved_at}).\nВосстановить их?",
+            QMessageBox.Yes | QMessageBox.No
+        )
+        if reply != QMessageBox.Yes:
+            self.autosave.discard()
+            return
+
+        self.model.restore(snapshot['data'])
+        self.current_file = snapshot['source']
+        self.journal = ChangeJournal(self.current_file) if self.current_file else None
+        self.view.file_path_edit.setText(self.current_file or "")
+        self.refresh_table()
+        self.update_columns_list()
+
     def save_data_to_cloud(self):
         """Сохраняет данные в Google Диск."""
-        if self.model.df is None or self.model.df.empty:
+        if self.model.row_count() == 0:
             QMessageBox.warning(self.view, "Ошибка", "Нет данных для сохранения!")
             return
 
@@ -493,6 +625,24 @@ class EditingModePresenter:
         self.analysis_window.show()
         self.view.close()
 
+    def show_memory_report(self):
+        """Показывает память по столбцам до и после приведения к схеме модели"""
+        report = self.dataset_loader.memory_report
+        if report is None:
+            QMessageBox.warning(self.view, "Ошибка", "Сначала загрузите данные!")
+            return
+
+        dialog = QDialog(self.view)
+        dialog.setWindowTitle("Отчет о памяти")
+        dialog.resize(700, 600)
+        layout = QVBoxLayout(dialog)
+        text = QTextEdit()
+        text.setReadOnly(True)
+        text.setFont(QFont("Courier New", 10))
+        text.setPlainText(report.to_string())
+        layout.addWidget(text)
+        dialog.exec()
+
     def show_about(self):
         """Информация о программе"""
         QMessageBox.about(self.view, "О программе",
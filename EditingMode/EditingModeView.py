@@ -1,8 +1,8 @@
 from PySide6.QtWidgets import (QMainWindow, QWidget, QVBoxLayout, QHBoxLayout,
-                               QLabel, QPushButton, QTableWidget, QTableWidgetItem,
+                               QLabel, QPushButton, QTableView,
                                QStackedWidget, QMessageBox, QDialog, QFormLayout, QRadioButton,
                                QLineEdit, QComboBox, QInputDialog, QSplitter, QListWidget, QGroupBox)
-from PySide6.QtCore import Qt
+from PySide6.QtCore import Qt, Signal
 from PySide6.QtGui import QAction, QIcon, QPixmap
 import os
 import sys
@@ -16,6 +16,8 @@ def resource_path(relative_path):
 
 
 class EditingModeView(QMainWindow):
+    closing = Signal()
+
     def __init__(self, current_user):
         super().__init__()
         self.current_user = current_user
@@ -25,22 +27,25 @@ class EditingModeView(QMainWindow):
         self.btn_load_local = QPushButton("Загрузить данные")
         self.btn_save_local = QPushButton("Сохранить данные")
         self.btn_save_as = QPushButton("Сохранить как...")
+        self.btn_compact = QPushButton("Объединить журнал с файлом")
         self.btn_load_from_cloud = QPushButton("Загрузить из облака")
         self.btn_save_to_cloud = QPushButton("Сохранить в облако")
 
         self.btn_add_row = QPushButton("Добавить запись")
         self.btn_edit_row = QPushButton("Изменить запись")
         self.btn_delete_row = QPushButton("Удалить запись")
+        self.btn_recompute = QPushButton("Пересчитать поля")
 
         self.columns_list = QListWidget()
 
         # Центральная область с таблицей
-        self.table = QTableWidget()
+        self.table = QTableView()
         self.init_ui()
 
         # Меню
         self.analysis_action = QAction("Анализ", self)
         self.about_action = QAction("О программе", self)
+        self.memory_report_action = QAction("Отчет о памяти", self)
         self.create_menus()
 
     def init_ui(self):
@@ -66,6 +71,7 @@ class EditingModeView(QMainWindow):
         layout_file.addWidget(self.btn_load_local)
         layout_file.addWidget(self.btn_save_local)
         layout_file.addWidget(self.btn_save_as)
+        layout_file.addWidget(self.btn_compact)
         layout_file.addWidget(self.btn_load_from_cloud)
         layout_file.addWidget(self.btn_save_to_cloud)
         left_layout.addWidget(group_file)
@@ -76,6 +82,7 @@ class EditingModeView(QMainWindow):
         layout_actions.addWidget(self.btn_add_row)
         layout_actions.addWidget(self.btn_edit_row)
         layout_actions.addWidget(self.btn_delete_row)
+        layout_actions.addWidget(self.btn_recompute)
         left_layout.addWidget(group_actions)
 
         # Группа столбцы
@@ -88,47 +95,8 @@ class EditingModeView(QMainWindow):
         right_panel = QWidget()
         right_layout = QVBoxLayout(right_panel)
 
-        # центральная таблица
-        self.table.setColumnCount(33)
-        self.table.setHorizontalHeaderLabels([
-            "Врач",
-            "ДСТ",
-            "Сумма",
-            "Возраст",
-            "Рост",
-            "Вес",
-            "ИМТ",
-            "ИМТ<25",
-            "ГМС(0-9)",
-            "ГМС(1-3)",
-            "ГМС: легк.степ.",
-            "ГМС: тяж.степ.",
-            "Кожа: легк.степ.",
-            "Кожа: тяж.степ.",
-            "Келоидные рубцы",
-            "Стрии",
-            "Геморрагии",
-            "Грыжи",
-            "Птозы",
-            "Хруст",
-            "ВЧС",
-            "Парадонтоз",
-            "Долихостеномелия",
-            "Кифоз/Лордоз",
-            "Деф.гр.клетки",
-            "Плоскостопие",
-            "Вальгус стоп",
-            "Хруст суставов",
-            "ПМК",
-            "Варикоз: легк.степ.",
-            "Варикоз: тяж.степ.",
-            "Миопия: легк.степ.",
-            "Миопия: тяж.степ.",
-            "Желч. пузырь",
-            "ГЭРБ",
-            "Гипотензия"
-        ])
-        self.table.setSelectionBehavior(QTableWidget.SelectionBehavior.SelectRows)
+        # центральная таблица: заголовки и строки задает модель таблицы
+        self.table.setSelectionBehavior(QTableView.SelectionBehavior.SelectRows)
         right_layout.addWidget(self.table)
 
         splitter.addWidget(left_panel)
@@ -164,6 +132,9 @@ class EditingModeView(QMainWindow):
         # Пункт "О программе"
         help_menu.addAction(self.about_action)
 
+        # Пункт "Отчет о памяти"
+        help_menu.addAction(self.memory_report_action)
+
         # меню "Режим"
         mode_menu = menubar.addMenu("Режим")
 
@@ -531,15 +502,8 @@ class EditingModeView(QMainWindow):
         layout22.addWidget(self.hypotension_no_radio)
         self.stacked_widget.addWidget(page22)
 
-    def update_table(self, df):
-        self.table.setRowCount(len(df))
-        self.table.setColumnCount(len(df.columns))
-        self.table.setHorizontalHeaderLabels(df.columns)
-
-        for row_idx, row in df.iterrows():
-            for col_idx, value in enumerate(row):
-                item = QTableWidgetItem(str(value))
-                self.table.setItem(row_idx, col_idx, item)
+    def set_table_model(self, model):
+        self.table.setModel(model)
 
     def get_current_page_index(self):
         return self.stacked_widget.currentIndex()
@@ -731,6 +695,10 @@ class EditingModeView(QMainWindow):
         self.hypotension_yes_radio.setChecked(False)
         self.hypotension_no_radio.setChecked(True)
 
+    def closeEvent(self, event):
+        self.closing.emit()
+        super().closeEvent(event)
+
     def show_error(self, message):
         QMessageBox.critical(self, "Ошибка", message)
 
@@ -738,7 +706,5 @@ class EditingModeView(QMainWindow):
         QMessageBox.information(self, "Успех", message)
 
     def get_selected_row_index(self):
-        selected = self.table.selectedItems()
-        if selected:
-            return selected[0].row()
-        return -1
+        rows = self.table.selectionModel().selectedRows() if self.table.model() else []
+        return rows[0].row() if rows else -1
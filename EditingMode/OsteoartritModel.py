@@ -1,59 +1,338 @@
+import numpy as np
 import pandas as pd
 
+# Бинарные признаки (0/1), участвующие в подсчете суммы баллов
+BINARY_COLUMNS = [
+    "ИМТ<25",
+    "ГМС: легк.степ.",
+    "ГМС: тяж.степ.",
+    "Кожа: легк.степ.",
+    "Кожа: тяж.степ.",
+    "Келоидные рубцы",
+    "Стрии",
+    "Геморрагии",
+    "Грыжи",
+    "Птозы",
+    "Хруст ВЧС",
+    "Парадонтоз",
+    "Долихостеномелия",
+    "Кифоз/Лордоз",
+    "Деф.гр.клетки",
+    "Плоскостопие",
+    "Вальгус стоп",
+    "Хруст суставов",
+    "ПМК",
+    "Варикоз: легк.степ.",
+    "Варикоз: тяж.степ.",
+    "Миопия: легк.степ.",
+    "Миопия: тяж.степ.",
+    "Желч. пузырь",
+    "ГЭРБ",
+    "Гипотензия",
+]
+
+# Компактная схема типов для столбцов модели (в порядке столбцов таблицы).
+# Бинарные признаки храним как int8, а не bool: select_dtypes(np.number)
+# в статистике и анализе должен их видеть.
+COLUMN_DTYPES = {
+    "Врач": "int16",
+    "ДСТ": "int8",
+    "Сумма": "int16",
+    "Возраст": "int16",
+    "Рост": "float32",
+    "Вес": "float32",
+    "ИМТ": "float32",
+    "ИМТ<25": "int8",
+    "ГМС(0-9)": "int8",
+    "ГМС(1-3)": "int8",
+}
+COLUMN_DTYPES.update({col: "int8" for col in BINARY_COLUMNS if col not in COLUMN_DTYPES})
+
+
+# Другие названия тех же столбцов в файлах врачей
+COLUMN_ALIASES = {
+    "ДСТ": ["Болезнь"],
+    "ГМС(0-9)": ["ГМС(1-9)"],
+}
+
+
+def _normalize_name(name):
+    # В файлах встречаются варианты "ГМС: легк. степ." и "ГМС: легк.степ."
+    return str(name).replace(" ", "")
+
+
+def resolve_columns(df: pd.DataFrame, names):
+    """Сопоставляет имена столбцов модели со столбцами DataFrame без учета пробелов"""
+    actual = {_normalize_name(col): col for col in df.columns}
+    resolved = []
+    missing = []
+    for name in names:
+        candidates = [name] + COLUMN_ALIASES.get(name, [])
+        found = [actual[_normalize_name(c)] for c in candidates if _normalize_name(c) in actual]
+        if found:
+            resolved.append(found[0])
+        else:
+            missing.append(name)
+    if missing:
+        raise KeyError(f"В данных отсутствуют столбцы: {', '.join(missing)}")
+    return resolved
+
+
+_NORMALIZED_DTYPES = {_normalize_name(col): dtype for col, dtype in COLUMN_DTYPES.items()}
+_NORMALIZED_DTYPES.update({_normalize_name(alias): COLUMN_DTYPES[col]
+                           for col, aliases in COLUMN_ALIASES.items() for alias in aliases})
+
+
+def _cast_column(series, dtype):
+    if not pd.api.types.is_numeric_dtype(series) or pd.api.types.is_bool_dtype(series):
+        try:
+            series = pd.to_numeric(series)
+        except (ValueError, TypeError):
+            return series  # Нечисловые значения оставляем как есть
+
+    if dtype.startswith("float"):
+        return series.astype(dtype)
+
+    # Целые с пропусками или дробными значениями храним как float32
+    if series.isna().any() or not (series == np.round(series)).all():
+        return series.astype("float32")
+
+    info = np.iinfo(dtype)
+    if len(series) and (series.min() < info.min or series.max() > info.max):
+        return series
+    return series.astype(dtype)
+
+
+def exact_floats(data):
+    """Переводит столбцы float32 в float64 по кратчайшей десятичной записи.
+
+    Значение float32 170.3 в float64 напрямую — 170.3000030517578; через
+    десятичную строку (numpy печатает кратчайшую запись, однозначно задающую
+    float32) получается ровно 170.3. Используется всеми записями в файлы
+    и базу, чтобы компактная схема не меняла сохраняемые значения.
+    data — Series или DataFrame; остальные столбцы возвращаются как есть.
+    """
+    if isinstance(data, pd.Series):
+        if data.dtype != np.float32:
+            return data
+        return pd.Series(data.to_numpy().astype(str).astype(np.float64), index=data.index, name=data.name)
+    columns = [col for col in data.columns if data[col].dtype == np.float32]
+    if not columns:
+        return data
+    result = data.copy(deep=False)
+    for col in columns:
+        result[col] = exact_floats(data[col])
+    return result
+
+
+def apply_schema(df: pd.DataFrame) -> pd.DataFrame:
+    """Приводит известные столбцы модели к компактным типам"""
+    result = df.copy(deep=False)
+    for col in df.columns:
+        dtype = _NORMALIZED_DTYPES.get(_normalize_name(col))
+        if dtype is not None and df[col].dtype != dtype:
+            result[col] = _cast_column(df[col], dtype)
+    return result
+
 
 class OsteoartritModel:
     def __init__(self):
-        self.df = pd.DataFrame(columns=[
-            "Врач",
-            "ДСТ",
-            "Сумма",
-            "Возраст",
-            "Рост",
-            "Вес",
-            "ИМТ",
-            "ИМТ<25",
-            "ГМС(0-9)",
-            "ГМС(1-3)",
-            "ГМС: легк.степ.",
-            "ГМС: тяж.степ.",
-            "Кожа: легк.степ.",
-            "Кожа: тяж.степ.",
-            "Келоидные рубцы",
-            "Стрии",
-            "Геморрагии",
-            "Грыжи",
-            "Птозы",
-            "Хруст ВЧС",
-            "Парадонтоз",
-            "Долихостеномелия",
-            "Кифоз/Лордоз",
-            "Деф.гр.клетки",
-            "Плоскостопие",
-            "Вальгус стоп",
-            "Хруст суставов",
-            "ПМК",
-            "Варикоз: легк.степ.",
-            "Варикоз: тяж.степ.",
-            "Миопия: легк.степ.",
-            "Миопия: тяж.степ.",
-            "Желч. пузырь",
-            "ГЭРБ",
-            "Гипотензия"
-        ])
-        self.df["Возраст"] = self.df["Возраст"].astype("Int32")
+        # Хранилище SQLite (SqliteStorage); если задано, записи правятся прямо в базе
+        self.storage = None
+        self.df = pd.DataFrame({col: pd.Series(dtype=dtype) for col, dtype in COLUMN_DTYPES.items()})
         self.num_of_columns = len(self.df.columns)
+        # Несохраненные операции для журнала изменений
+        self.pending_changes = []
+        # Массовые изменения сохраняются только полной перезаписью файла
+        self.needs_full_save = False
+        # Счетчик изменений данных и его значение на момент последнего сохранения
+        self.version = 0
+        self.saved_version = 0
+        # Версия последнего массового изменения
+        self.bulk_version = 0
+
+    @property
+    def df(self):
+        if self._df is None and self.storage is not None:
+            self._df = self.storage.read_frame()  # Полная таблица только по требованию
+        return self._df
+
+    @df.setter
+    def df(self, value):
+        self._df = value
+
+    @property
+    def columns(self):
+        if self.storage is not None:
+            return list(self.storage.columns)
+        return list(self._df.columns)
+
+    def row_count(self):
+        if self.storage is not None:
+            return self.storage.count()
+        return len(self._df)
+
+    def get_row(self, index):
+        """Запись по порядковому номеру в виде Series"""
+        if self.storage is not None:
+            return self.storage.read_row(index)
+        return self._df.iloc[index]
+
+    def open_storage(self, storage):
+        """Переключает модель на хранение записей в базе SQLite"""
+        self.close_storage()
+        self.storage = storage
+        self._df = None
+        self.reset_changes()
+
+    def close_storage(self, keep_data=True):
+        """Возвращает модель к хранению записей в памяти.
+
+        keep_data=False — данные будут сразу заменены, читать базу не нужно.
+        """
+        if self.storage is not None:
+            self._df = self.df if keep_data else None
+            self.storage.close()
+            self.storage = None
 
     def add_row(self, record):
-        new_row = pd.DataFrame([record], columns=self.df.columns)
-        self.df["Возраст"] = self.df["Возраст"].astype("Int64")
+        if self.storage is not None:
+            self.storage.insert(record)
+            self._stored()
+            return
+        new_row = apply_schema(pd.DataFrame([record], columns=self.df.columns))
         self.df = pd.concat([self.df, new_row], ignore_index=True)
+        self.pending_changes.append({'op': 'add', 'record': list(record)})
+        self.version += 1
 
     def update_row(self, index, record):
+        if self.storage is not None:
+            if 0 <= index < self.storage.count():
+                self.storage.update(index, record)
+                self._stored()
+            return
         if 0 <= index < len(self.df):
             self.df.loc[index] = record
+            self.pending_changes.append({'op': 'update', 'index': index, 'record': list(record)})
+            self.version += 1
 
     def delete_row(self, index):
+        if self.storage is not None:
+            if 0 <= index < self.storage.count():
+                self.storage.delete(index)
+                self._stored()
+            return
         if 0 <= index < len(self.df):
             self.df = self.df.drop(index).reset_index(drop=True)
+            self.pending_changes.append({'op': 'delete', 'index': index})
+            self.version += 1
+
+    def reset_changes(self):
+        """Отмечает текущее состояние данных как сохраненное"""
+        self.pending_changes = []
+        self.needs_full_save = False
+        self.saved_version = self.version
+
+    def snapshot(self):
+        """Копия данных для фоновой записи и отметка состояния, которое она содержит"""
+        return self.df.copy(), (self.version, len(self.pending_changes))
+
+    def mark_saved(self, mark):
+        """Отмечает сохраненным состояние на момент snapshot().
+
+        Правки, сделанные во время фоновой записи, остаются несохраненными.
+        """
+        version, pending_count = mark
+        if self.version == version:
+            self.reset_changes()
+            return
+        self.pending_changes = self.pending_changes[pending_count:]
+        self.needs_full_save = self.bulk_version > version
+        self.saved_version = version
+
+    def is_dirty(self):
+        """Есть ли изменения после последнего сохранения"""
+        return self.version != self.saved_version
+
+    def restore(self, df):
+        """Подставляет восстановленные данные; сохранить их можно только целиком"""
+        self.df = df
+        self.pending_changes = []
+        self._bulk_changed()
+
+    def recompute_derived(self, scoring):
+        """Пересчитывает вычисляемые столбцы для всех записей.
+
+        ИМТ, ИМТ<25, ГМС(1-3), степени ГМС, Сумма и ДСТ считаются векторно
+        по росту, весу, ГМС(0-9) и бинарным признакам (scoring — ScoringService).
+        Строки с пропущенными исходными значениями не изменяются.
+        Возвращает номера строк, в которых изменилось хотя бы одно значение.
+        """
+        (height_col, weight_col, gms_col, bmi_col, bmi_flag_col,
+         gms2_col, gms_light_col, gms_heavy_col, sum_col, dst_col) = resolve_columns(self.df, [
+            "Рост", "Вес", "ГМС(0-9)", "ИМТ", "ИМТ<25",
+            "ГМС(1-3)", "ГМС: легк.степ.", "ГМС: тяж.степ.", "Сумма", "ДСТ"
+        ])
+        height = pd.to_numeric(self.df[height_col], errors='coerce').to_numpy(dtype=np.float64)
+        weight = pd.to_numeric(self.df[weight_col], errors='coerce').to_numpy(dtype=np.float64)
+        gms = pd.to_numeric(self.df[gms_col], errors='coerce').to_numpy(dtype=np.float64)
+
+        with np.errstate(divide='ignore', invalid='ignore'):
+            bmi = np.round(weight / (height / 100) ** 2)
+        valid = np.isfinite(bmi) & np.isfinite(gms)
+        gms2 = np.where(gms < 4, 1, np.where(gms <= 5, 2, 3))
+
+        derived = pd.DataFrame({
+            bmi_col: bmi,
+            bmi_flag_col: bmi < 25,
+            gms2_col: gms2,
+            gms_light_col: gms2 == 2,
+            gms_heavy_col: gms2 == 3,
+        }, index=self.df.index)
+
+        old = self.df.copy(deep=False)
+        updated = self.df.copy(deep=False)
+        for col in derived.columns:
+            updated[col] = np.where(valid, derived[col].to_numpy(dtype=np.float64),
+                                    pd.to_numeric(old[col], errors='coerce').to_numpy(dtype=np.float64))
+
+        scores, dst = scoring.score_frame(updated)
+        updated[sum_col] = np.where(valid, scores, pd.to_numeric(old[sum_col], errors='coerce'))
+        updated[dst_col] = np.where(valid, dst, pd.to_numeric(old[dst_col], errors='coerce'))
+
+        changed = np.zeros(len(self.df), dtype=bool)
+        for col in list(derived.columns) + [sum_col, dst_col]:
+            before = pd.to_numeric(old[col], errors='coerce').to_numpy(dtype=np.float64)
+            after = updated[col].to_numpy(dtype=np.float64)
+            changed |= ~((before == after) | (np.isnan(before) & np.isnan(after)))
+
+        self.df = apply_schema(updated)
+        self._bulk_changed()
+        if self.storage is not None:
+            self.storage.import_frame(self.df)
+            self._stored()
+        return np.flatnonzero(changed)
+
+    def rescore(self, scoring):
+        """Пересчет суммы баллов и ДСТ для всех записей (scoring — ScoringService)"""
+        sum_col, dst_col = resolve_columns(self.df, ["Сумма", "ДСТ"])
+        scores, dst = scoring.score_frame(self.df)
+        self.df[sum_col] = scores
+        self.df[dst_col] = dst
+        self._bulk_changed()
+        if self.storage is not None:
+            self.storage.import_frame(self.df)
+            self._stored()
+
+    def _bulk_changed(self):
+        self.needs_full_save = True
+        self.version += 1
+        self.bulk_version = self.version
+
+    def _stored(self):
+        # Правка уже записана в базу: кэш таблицы устарел, сохранять нечего
+        self._df = None
+        self.version += 1
+        self.reset_changes()
 
 
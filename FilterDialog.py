@@ -1,11 +1,17 @@
-from PySide6.QtWidgets import QDialog, QVBoxLayout, QFormLayout, QComboBox, QLineEdit, QPushButton
+from PySide6.QtCore import QTimer
+from PySide6.QtWidgets import QDialog, QVBoxLayout, QFormLayout, QComboBox, QLineEdit, QPushButton, QLabel
+
+# Пауза ввода, после которой пересчитывается число строк выражения
+COUNT_DELAY_MS = 300
 
 
 class FilterDialog(QDialog):
-    def __init__(self, columns, parent=None):
+    def __init__(self, columns, parent=None, count_rows=None):
         super().__init__(parent)
         self.setWindowTitle("Фильтрация данных")
         self.columns = columns
+        # count_rows(текст выражения) -> число строк; показывается по мере ввода
+        self.count_rows = count_rows
         self.init_ui()
 
     def init_ui(self):
@@ -25,15 +31,41 @@ class FilterDialog(QDialog):
 
         layout.addLayout(form_layout)
 
+        # Составное условие вместо одного сравнения
+        layout.addWidget(QLabel("Или выражение (AND, OR, NOT, IN, BETWEEN, IS NULL, CONTAINS):"))
+        self.expression_edit = QLineEdit()
+        self.expression_edit.setPlaceholderText("Возраст BETWEEN 30 AND 50 AND Врач IN (1, 2) AND NOT [ИМТ<25] = 1")
+        layout.addWidget(self.expression_edit)
+        self.count_label = QLabel("")
+        layout.addWidget(self.count_label)
+        if self.count_rows is not None:
+            # Выражение разбирается и вычисляется, только когда ввод приостановлен
+            self.count_timer = QTimer(self)
+            self.count_timer.setSingleShot(True)
+            self.count_timer.setInterval(COUNT_DELAY_MS)
+            self.count_timer.timeout.connect(self.update_count)
+            self.expression_edit.textChanged.connect(lambda _: self.count_timer.start())
+
         self.btn_apply = QPushButton("Применить фильтр")
         self.btn_apply.clicked.connect(self.accept)
         layout.addWidget(self.btn_apply)
 
         self.setLayout(layout)
 
+    def update_count(self):
+        text = self.expression_edit.text()
+        if not text.strip():
+            self.count_label.setText("")
+            return
+        try:
+            self.count_label.setText(f"Строк: {self.count_rows(text)}")
+        except Exception:
+            self.count_label.setText("Строк: —")  # Выражение еще не дописано
+
     def get_filter(self):
         return {
             'column': self.column_combo.currentText(),
             'operator': self.operator_combo.currentText(),
-            'value': self.value_edit.text()
+            'value': self.value_edit.text(),
+            'expression': self.expression_edit.text().strip()
         }
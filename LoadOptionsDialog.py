@@ -0,0 +1,87 @@
+from PySide6.QtCore import Qt
+from PySide6.QtWidgets import (QDialog, QVBoxLayout, QHBoxLayout, QLabel, QListWidget, QListWidgetItem,
+                               QRadioButton, QSpinBox, QPushButton, QGroupBox)
+
+
+class LoadOptionsDialog(QDialog):
+    """Выбор столбцов и режима предпросмотра перед загрузкой файла"""
+    def __init__(self, columns, parent=None):
+        super().__init__(parent)
+        self.setWindowTitle("Параметры загрузки")
+        self.columns = columns
+        self.init_ui()
+
+    def init_ui(self):
+        layout = QVBoxLayout()
+
+        layout.addWidget(QLabel("Столбцы для загрузки:"))
+        self.columns_list = QListWidget()
+        for col in self.columns:
+            item = QListWidgetItem(str(col))
+            item.setFlags(item.flags() | Qt.ItemFlag.ItemIsUserCheckable)
+            item.setCheckState(Qt.CheckState.Checked)
+            self.columns_list.addItem(item)
+        layout.addWidget(self.columns_list)
+
+        buttons_layout = QHBoxLayout()
+        self.btn_select_all = QPushButton("Выбрать все")
+        self.btn_select_all.clicked.connect(lambda: self.set_all_checked(True))
+        self.btn_clear_all = QPushButton("Снять все")
+        self.btn_clear_all.clicked.connect(lambda: self.set_all_checked(False))
+        buttons_layout.addWidget(self.btn_select_all)
+        buttons_layout.addWidget(self.btn_clear_all)
+        layout.addLayout(buttons_layout)
+
+        group_rows = QGroupBox("Строки")
+        rows_layout = QVBoxLayout(group_rows)
+        self.full_radio = QRadioButton("Все строки")
+        self.full_radio.setChecked(True)
+        rows_layout.addWidget(self.full_radio)
+
+        head_layout = QHBoxLayout()
+        self.head_radio = QRadioButton("Первые строки:")
+        self.head_spin = QSpinBox()
+        self.head_spin.setRange(1, 10_000_000)
+        self.head_spin.setValue(1000)
+        head_layout.addWidget(self.head_radio)
+        head_layout.addWidget(self.head_spin)
+        rows_layout.addLayout(head_layout)
+
+        sample_layout = QHBoxLayout()
+        self.sample_radio = QRadioButton("Случайная выборка, %:")
+        self.sample_spin = QSpinBox()
+        self.sample_spin.setRange(1, 99)
+        self.sample_spin.setValue(10)
+        sample_layout.addWidget(self.sample_radio)
+        sample_layout.addWidget(self.sample_spin)
+        rows_layout.addLayout(sample_layout)
+        layout.addWidget(group_rows)
+
+        self.btn_load = QPushButton("Загрузить")
+        self.btn_load.clicked.connect(self.accept)
+        layout.addWidget(self.btn_load)
+
+        self.setLayout(layout)
+
+    def set_all_checked(self, checked):
+        state = Qt.CheckState.Checked if checked else Qt.CheckState.Unchecked
+        for i in range(self.columns_list.count()):
+            self.columns_list.item(i).setCheckState(state)
+
+    def accept(self):
+        if not self.selected_columns():
+            return  # Без единого столбца загружать нечего
+        super().accept()
+
+    def selected_columns(self):
+        return [self.columns[i] for i in range(self.columns_list.count())
+                if self.columns_list.item(i).checkState() == Qt.CheckState.Checked]
+
+    def get_options(self):
+        """Параметры для DatasetLoader.load: usecols, nrows, fraction"""
+        selected = self.selected_columns()
+        return {
+            'usecols': None if len(selected) == len(self.columns) else selected,
+            'nrows': self.head_spin.value() if self.head_radio.isChecked() else None,
+            'fraction': self.sample_spin.value() / 100 if self.sample_radio.isChecked() else None
+        }
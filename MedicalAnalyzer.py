@@ -1,5 +1,6 @@
 import os
 import sys
+import multiprocessing
 from PySide6.QtWidgets import QApplication, QDialog
 from Login.LoginView import LoginView
 from Login.LoginModel import LoginModel
@@ -21,6 +22,8 @@ def get_db_path():
 db_users_file_name = get_db_path()
 
 if __name__ == '__main__':
+    # Нужно для пула процессов при загрузке папки в собранном exe
+    multiprocessing.freeze_support()
     app = QApplication(sys.argv)
 
     login_view = LoginView()
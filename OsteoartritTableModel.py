@@ -0,0 +1,87 @@
+from collections import OrderedDict
+import pandas as pd
+from PySide6.QtCore import Qt, QAbstractTableModel, QModelIndex
+
+PAGE_ROWS = 500
+MAX_CACHED_PAGES = 20
+
+
+class OsteoartritTableModel(QAbstractTableModel):
+    """Модель таблицы режима сбора данных поверх OsteoartritModel.
+
+    Добавление, изменение и удаление записи выполняются через модель таблицы
+    и сообщают представлению только о затронутой строке, поэтому правка
+    не перестраивает таблицу. Записи из базы SQLite читаются страницами
+    по мере прокрутки, в памяти держится не больше MAX_CACHED_PAGES страниц.
+    """
+    def __init__(self, model, page_rows=PAGE_ROWS):
+        super().__init__()
+        self._model = model
+        self._page_rows = page_rows
+        self._pages = OrderedDict()
+
+    def rowCount(self, parent=QModelIndex()):
+        return self._model.row_count()
+
+    def columnCount(self, parent=QModelIndex()):
+        return len(self._model.columns)
+
+    def data(self, index, role=Qt.DisplayRole):
+        if index.isValid() and role == Qt.DisplayRole:
+            if self._model.storage is not None:
+                page, offset = divmod(index.row(), self._page_rows)
+                rows = self._get_page(page)
+                value = rows[offset][index.column()] if offset < len(rows) else None
+            else:
+                value = self._model.df.iat[index.row(), index.column()]
+            return "" if value is None or pd.isna(value) else str(value)
+        return None
+
+    def headerData(self, section, orientation, role):
+        if role == Qt.DisplayRole:
+            if orientation == Qt.Horizontal:
+                return str(self._model.columns[section])
+            else:
+                return str(section)
+        return None
+
+    def add_row(self, record):
+        row = self._model.row_count()
+        self.beginInsertRows(QModelIndex(), row, row)
+        self._model.add_row(record)
+        self._drop_pages(row, to_end=False)
+        self.endInsertRows()
+
+    def update_row(self, index, record):
+        self._model.update_row(index, record)
+        self._drop_pages(index, to_end=False)
+        self.dataChanged.emit(self.index(index, 0), self.index(index, self.columnCount() - 1))
+
+    def delete_row(self, index):
+        self.beginRemoveRows(QModelIndex(), index, index)
+        self._model.delete_row(index)
+        self._drop_pages(index, to_end=True)  # Следующие строки сдвинулись
+        self.endRemoveRows()
+
+    def refresh(self):
+        """Полное обновление после загрузки или массового пересчета данных"""
+        self.beginResetModel()
+        self._pages.clear()
+        self.endResetModel()
+
+    def _drop_pages(self, row, to_end):
+        first = row // self._page_rows
+        for page in list(self._pages):
+            if page == first or (to_end and page > first):
+                del self._pages[page]
+
+    def _get_page(self, page):
+        rows = self._pages.get(page)
+        if rows is None:
+            rows = self._model.storage.fetch_rows(page * self._page_rows, self._page_rows)
+            self._pages[page] = rows
+            if len(self._pages) > MAX_CACHED_PAGES:
+                self._pages.popitem(last=False)
+        else:
+            self._pages.move_to_end(page)
+        return rows
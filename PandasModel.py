@@ -1,22 +1,91 @@
-from PySide6.QtCore import Qt, QAbstractTableModel
+from collections import OrderedDict
+import numpy as np
+import pandas as pd
+from PySide6.QtCore import Qt, QAbstractTableModel, QModelIndex
+from PySide6.QtGui import QGuiApplication
+
+BLOCK_ROWS = 256
+MAX_CACHED_BLOCKS = 400
+MAX_CACHED_ORDERS = 8
+FETCH_ROWS = 1000
+SAMPLE_ROWS = 200
+COLUMN_PADDING = 16
+
+
+def fit_columns_to_sample(table_view, sample_rows=SAMPLE_ROWS):
+    """Ширина столбцов по заголовку и выборке строк.
+
+    Замена resizeColumnsToContents, который перебирает все строки модели.
+    """
+    model = table_view.model()
+    metrics = table_view.fontMetrics()
+    for column in range(model.columnCount()):
+        texts = model.sample_texts(column, sample_rows)
+        texts.append(model.headerData(column, Qt.Horizontal, Qt.DisplayRole))
+        width = max(metrics.horizontalAdvance(text) for text in texts)
+        table_view.setColumnWidth(column, width + COLUMN_PADDING)
 
 
 # 3. Модели данных
 class PandasModel(QAbstractTableModel):
-    """Модель для отображения DataFrame в QTableView"""
-    def __init__(self, data):
+    """Модель для отображения DataFrame в QTableView.
+
+    Ячейки не форматируются по одной: при первом обращении столбец
+    форматируется блоком из BLOCK_ROWS строк в массив строк, и data()
+    берет готовое значение из массива. В памяти держится не больше
+    MAX_CACHED_BLOCKS блоков; при изменении данных кэш сбрасывается.
+    float_format — формат дробных чисел в стиле '%.2f' (None — как str(),
+    для float32 это кратчайшая запись: 170.3, а не 170.3000030517578).
+
+    Сортировка не копирует DataFrame: строки показываются через перестановку
+    номеров (устойчивый argsort), перестановки запоминаются для повторных
+    щелчков. Щелчок с Shift добавляет столбец к ключам сортировки.
+
+    Строки отдаются представлению порциями по fetch_rows (canFetchMore /
+    fetchMore), поэтому открытие большого набора не зависит от его размера.
+
+    rows — номера показываемых строк DataFrame (фильтр без копирования
+    данных, см. FilteredDataset); None — все строки.
+    """
+    def __init__(self, data, float_format=None, fetch_rows=FETCH_ROWS, rows=None):
         super().__init__()
         self._data = data
+        self.float_format = float_format
+        self.fetch_rows = fetch_rows
+        self._rows = rows
+        self._loaded_rows = min(self._total_rows(), fetch_rows)
+        self._blocks = OrderedDict()
+        self._alignments = self._column_alignments()
+        self._order = rows  # Номера строк DataFrame в порядке показа; None — исходный порядок
+        self._sort_keys = []  # [(номер столбца, по возрастанию)]
+        self._ranks = {}
+        self._orders = OrderedDict()
 
     def rowCount(self, parent=None):
-        return self._data.shape[0]
+        return self._loaded_rows
+
+    def canFetchMore(self, parent=QModelIndex()):
+        return self._loaded_rows < self._total_rows()
+
+    def fetchMore(self, parent=QModelIndex()):
+        count = min(self.fetch_rows, self._total_rows() - self._loaded_rows)
+        if count <= 0:
+            return
+        self.beginInsertRows(QModelIndex(), self._loaded_rows, self._loaded_rows + count - 1)
+        self._loaded_rows += count
+        self.endInsertRows()
 
     def columnCount(self, parent=None):
         return self._data.shape[1]
 
     def data(self, index, role=Qt.DisplayRole):
-        if index.isValid() and role == Qt.DisplayRole:
-            return str(self._data.iloc[index.row(), index.column()])
+        if not index.isValid():
+            return None
+        if role == Qt.DisplayRole:
+            block, offset = divmod(index.row(), BLOCK_ROWS)
+            return self._get_block(index.column(), block)[offset]
+        if role == Qt.TextAlignmentRole:
+            return self._alignments[index.column()]
         return None
 
     def headerData(self, section, orientation, role):
@@ -24,16 +93,144 @@ class PandasModel(QAbstractTableModel):
             if orientation == Qt.Horizontal:
                 return str(self._data.columns[section])
             else:
-                return str(self._data.index[section])
+                return str(self._data.index[self.source_row(section)])
         return None
 
+    def source_row(self, row):
+        """Номер строки в DataFrame для строки таблицы"""
+        return row if self._order is None else int(self._order[row])
+
     def sort(self, column, order):
-        """Базовая сортировка"""
-        if 0 <= column < self.columnCount():
-            colname = self._data.columns[column]
-            self._data = self._data.sort_values(
-                colname,
-                ascending=(order == Qt.AscendingOrder),
-                kind='mergesort'
-            )
-            self.layoutChanged.emit()
+        """Сортировка по столбцу; с Shift — дополнительный ключ сортировки"""
+        if not 0 <= column < self.columnCount():
+            keys = []  # Qt передает -1, чтобы вернуть исходный порядок
+        else:
+            ascending = order == Qt.AscendingOrder
+            keys = [key for key in self._sort_keys if key[0] != column]
+            shift = QGuiApplication.keyboardModifiers() & Qt.ShiftModifier
+            if shift and len(keys) == len(self._sort_keys):
+                keys.append((column, ascending))
+            elif shift:
+                keys = [(column, ascending) if key[0] == column else key for key in self._sort_keys]
+            else:
+                keys = [(column, ascending)]
+
+        self.layoutAboutToBeChanged.emit()
+        self._sort_keys = keys
+        self._order = self._get_order(tuple(keys)) if keys else self._rows
+        self._blocks.clear()
+        self.layoutChanged.emit()
+
+    def set_data(self, data):
+        """Замена отображаемого DataFrame со сбросом отформатированных блоков"""
+        self.beginResetModel()
+        self._data = data
+        self._rows = None
+        self._loaded_rows = min(len(data), self.fetch_rows)
+        self._blocks.clear()
+        self._alignments = self._column_alignments()
+        self._order = None
+        self._sort_keys = []
+        self._ranks.clear()
+        self._orders.clear()
+        self.endResetModel()
+
+    def set_rows(self, rows):
+        """Смена показываемых строк (фильтра); ранги столбцов для сортировки сохраняются"""
+        self.beginResetModel()
+        self._rows = rows
+        self._loaded_rows = min(self._total_rows(), self.fetch_rows)
+        self._blocks.clear()
+        self._orders.clear()
+        self._order = self._get_order(tuple(self._sort_keys)) if self._sort_keys else rows
+        self.endResetModel()
+
+    def _total_rows(self):
+        return self._data.shape[0] if self._rows is None else len(self._rows)
+
+    def _get_order(self, keys):
+        order = self._orders.get(keys)
+        if order is None:
+            # lexsort устойчив и считает главным последний ключ
+            sort_keys = [self._sort_key(column, ascending) for column, ascending in reversed(keys)]
+            if self._rows is None:
+                order = np.lexsort(sort_keys)
+            else:
+                order = self._rows[np.lexsort([key[self._rows] for key in sort_keys])]
+            self._orders[keys] = order
+            if len(self._orders) > MAX_CACHED_ORDERS:
+                self._orders.popitem(last=False)
+        else:
+            self._orders.move_to_end(keys)
+        return order
+
+    def _sort_key(self, column, ascending):
+        """Целочисленный ключ столбца: ранг значения, пропуски всегда в конце"""
+        ranks = self._ranks.get(column)
+        if ranks is None:
+            values = self._data.iloc[:, column]
+            try:
+                codes, uniques = pd.factorize(values, sort=True)
+            except TypeError:
+                # Столбец со смешанными типами сортируем по строковому виду
+                codes, uniques = pd.factorize(values.astype(str).where(values.notna()), sort=True)
+            ranks = (codes, len(uniques))
+            self._ranks[column] = ranks
+        codes, count = ranks
+        key = codes if ascending else count - 1 - codes
+        return np.where(codes < 0, count, key)
+
+    def _column_alignments(self):
+        # Числа выравниваются по правому краю, остальное — по левому
+        return [
+            (Qt.AlignRight if pd.api.types.is_numeric_dtype(dtype) and not pd.api.types.is_bool_dtype(dtype)
+             else Qt.AlignLeft) | Qt.AlignVCenter
+            for dtype in self._data.dtypes
+        ]
+
+    def _get_block(self, column, block):
+        key = (column, block)
+        values = self._blocks.get(key)
+        if values is None:
+            start = block * BLOCK_ROWS
+            if self._order is None:
+                rows = slice(start, start + BLOCK_ROWS)
+            else:
+                rows = self._order[start:start + BLOCK_ROWS]
+            values = self._format(self._data.iloc[rows, column])
+            self._blocks[key] = values
+            if len(self._blocks) > MAX_CACHED_BLOCKS:
+                self._blocks.popitem(last=False)
+        else:
+            self._blocks.move_to_end(key)
+        return values
+
+    def sample_texts(self, column, sample_rows=SAMPLE_ROWS):
+        """Отформатированные значения столбца для равномерной выборки строк"""
+        total = self._total_rows()
+        if total == 0:
+            return []
+        positions = np.unique(np.linspace(0, total - 1, min(sample_rows, total)).astype(np.intp))
+        if self._rows is not None:
+            positions = self._rows[positions]
+        return list(self._format(self._data.iloc[positions, column]))
+
+    def _format(self, series):
+        """Строковое представление части столбца одной векторной операцией"""
+        missing = series.isna().to_numpy()
+        if pd.api.types.is_float_dtype(series.dtype):
+            if isinstance(series.dtype, np.dtype):
+                numbers = series.to_numpy()
+            else:
+                numbers = series.to_numpy(dtype='float64', na_value=np.nan)
+            if self.float_format:
+                text = np.char.mod(self.float_format, numbers)
+            else:
+                text = numbers.astype(str)
+        elif isinstance(series.dtype, np.dtype) and series.dtype.kind in 'iub':
+            text = series.to_numpy().astype(str)
+        else:
+            text = series.astype(str).to_numpy(dtype=object)
+        text = text.astype(object)
+        text[missing] = ""
+        return text
@@ -1,15 +1,23 @@
 import pandas as pd
 import numpy as np
+from Services.OutOfCoreService import MemmapMatrix
 
 
 class AnalysisService:
     def __init__(self, data: pd.DataFrame):
+        # data — DataFrame или MemmapMatrix (режим работы с диска, расчет порциями)
         self.data = data
+        self.out_of_core = isinstance(data, MemmapMatrix)
+
+    def _numeric_columns(self):
+        if self.out_of_core:
+            return pd.Index(self.data.columns)
+        return self.data.select_dtypes(include=np.number).columns
 
     def get_correlation_analysis_report(self):
 
         # Выбираем только числовые колонки
-        numeric_cols = self.data.select_dtypes(include=np.number).columns
+        numeric_cols = self._numeric_columns()
         if len(numeric_cols) < 2:
             raise ValueError("Недостаточно числовых данных для анализа корреляций")
 
@@ -66,8 +74,11 @@ class AnalysisService:
 
     def get_distribution_analysis_report(self):
         """Анализ распределений данных с табличным форматированием"""
-        numeric_cols = self.data.select_dtypes(include=np.number).columns
+        numeric_cols = self._numeric_columns()
         report = []
+        if self.out_of_core:
+            moments = self.data.moments()
+            medians = self.data.quantiles([0.5])[0.5]
 
         # Рассчитываем максимальные ширины столбцов
         max_name_len = max(len(str(col)) for col in numeric_cols) if not numeric_cols.empty else 15
@@ -97,10 +108,16 @@ class AnalysisService:
 
         # Данные
         for col in numeric_cols:
-            mean = self.data[col].mean()
-            median = self.data[col].median()
-            skewness = self.data[col].skew()
-            kurtosis = self.data[col].kurtosis()
+            if self.out_of_core:
+                mean = moments.at[col, 'mean']
+                median = medians[col]
+                skewness = moments.at[col, 'skew']
+                kurtosis = moments.at[col, 'kurt']
+            else:
+                mean = self.data[col].mean()
+                median = self.data[col].median()
+                skewness = self.data[col].skew()
+                kurtosis = self.data[col].kurtosis()
 
             dist_type = "нормальное" if -0.5 < skewness < 0.5 else (
                 "скошенное вправо" if skewness > 0 else "скошенное влево"
@@ -132,8 +149,12 @@ class AnalysisService:
     def get_outliers_analysis_report(self):
         """Анализ выбросов по методу IQR"""
         report = ["=== Анализ выбросов (метод IQR) ==="]
-        numeric_cols = self.data.select_dtypes(include=np.number).columns
+        numeric_cols = self._numeric_columns()
         outliers_count = {}
+        if self.out_of_core:
+            quartiles = self.data.quantiles([0.25, 0.75])
+            iqr = quartiles[0.75] - quartiles[0.25]
+            outside = self.data.count_outside(quartiles[0.25] - 1.5 * iqr, quartiles[0.75] + 1.5 * iqr)
 
         # Определяем ширину столбцов
         col_name_width = max(len(col) for col in numeric_cols) + 2
@@ -149,14 +170,20 @@ class AnalysisService:
         report.append("-" * len(header))
 
         for col in numeric_cols:
-            q1 = self.data[col].quantile(0.25)
-            q3 = self.data[col].quantile(0.75)
+            if self.out_of_core:
+                q1, q3 = quartiles.at[col, 0.25], quartiles.at[col, 0.75]
+            else:
+                q1 = self.data[col].quantile(0.25)
+                q3 = self.data[col].quantile(0.75)
             iqr = q3 - q1
             lower_bound = q1 - 1.5 * iqr
             upper_bound = q3 + 1.5 * iqr
 
-            outliers = self.data[(self.data[col] < lower_bound) | (self.data[col] > upper_bound)]
-            count = len(outliers)
+            if self.out_of_core:
+                count = int(outside[col])
+            else:
+                outliers = self.data[(self.data[col] < lower_bound) | (self.data[col] > upper_bound)]
+                count = len(outliers)
             outliers_count[col] = count
 
             # Форматируем строку с выравниванием
@@ -179,7 +206,7 @@ class AnalysisService:
         """Анализ пропущенных значений"""
         report = ["=== Анализ пропущенных значений ==="]
         total = len(self.data)
-        missing = self.data.isnull().sum()
+        missing = self.get_missing_counts()
         missing = missing[missing > 0]
 
         if missing.empty:
@@ -193,6 +220,12 @@ class AnalysisService:
 
         return report
 
+    def get_missing_counts(self) -> pd.Series:
+        """Число пропусков по столбцам"""
+        if self.out_of_core:
+            return self.data.missing_counts()
+        return self.data.isnull().sum()
+
     def get_cluster_analysis_report(self, features, n_clusters=3):
         """Кластерный анализ методом K-средних"""
         from sklearn.cluster import KMeans
@@ -210,9 +243,8 @@ class AnalysisService:
         kmeans = KMeans(n_clusters=n_clusters, random_state=42)
         clusters = kmeans.fit_predict(scaled)
 
-        # Анализ результатов
-        self.data['Cluster'] = clusters
-        cluster_stats = self.data.groupby('Cluster')[features].mean()
+        # Анализ результатов (исходные данные не изменяются)
+        cluster_stats = self.data[features].assign(Cluster=clusters).groupby('Cluster').mean()
 
         report.append("\nСредние значения по кластерам:")
         report.append(cluster_stats.to_string())
@@ -222,10 +254,12 @@ class AnalysisService:
 
     def get_correlation_matrix(self):
         # Выбираем только числовые колонки
-        numeric_cols = self.data.select_dtypes(include=np.number).columns
+        numeric_cols = self._numeric_columns()
         if len(numeric_cols) < 2:
             raise ValueError("Недостаточно числовых данных для анализа корреляций")
         # Считаем корреляционную матрицу
+        if self.out_of_core:
+            return self.data.corr(numeric_cols)
         corr_matrix = self.data[numeric_cols].corr()
         return corr_matrix
 
@@ -0,0 +1,150 @@
+import os
+import time
+import pickle
+import tempfile
+from PySide6.QtCore import QThreadPool
+from Services.CacheService import get_app_dir
+from Services.LoadWorker import LoadWorker
+
+AUTOSAVE_INTERVAL_MS = 60 * 1000
+AUTOSAVE_EVERY_EDITS = 5
+
+
+def get_autosave_dir():
+    """Возвращает путь к папке автосохранений рядом с exe или скриптом"""
+    return os.path.join(get_app_dir(), "autosave")
+
+
+class AutosaveService:
+    """Фоновое автосохранение несохраненных данных режима редактирования.
+
+    Снимок DataFrame копируется в потоке интерфейса (model.snapshot(): это
+    блокирующее копирование O(n), но таблица хранится в компактных типах,
+    поэтому оно быстрое), а сериализация и запись на диск выполняются
+    в собственном однопоточном пуле сервиса. Снимок удаляется после ручного сохранения; если
+    программа завершилась аварийно, он предлагается к восстановлению
+    при следующем открытии режима редактирования.
+    """
+    def __init__(self, session_name, autosave_dir=None, every_edits=AUTOSAVE_EVERY_EDITS):
+        self.autosave_dir = autosave_dir or get_autosave_dir()
+        self.path = os.path.join(self.autosave_dir, f"{session_name}.pkl")
+        self.every_edits = every_edits
+        self.saved_version = None
+        self.worker = None
+        self._discard_pending = False
+        # Свой пул: ожидание при закрытии не зависит от загрузок и сохранений в общем пуле
+        self.pool = QThreadPool()
+        self.pool.setMaxThreadCount(1)
+        os.makedirs(self.autosave_dir, exist_ok=True)
+
+    def maybe_save(self, model, source, force=False):
+        """Запускает фоновое сохранение снимка, если накопилось достаточно правок.
+
+        force=True (по таймеру) сохраняет при любом числе новых правок.
+        """
+        if not model.is_dirty() or model.version == self.saved_version:
+            return
+        last_version = max(self.saved_version or 0, model.saved_version)
+        if not force and model.version - last_version < self.every_edits:
+            return
+        if self.worker is not None:
+            return  # Предыдущая запись еще идет, следующая попытка — по таймеру
+
+        snapshot = self._snapshot(model, source)
+        worker = LoadWorker(self._write_snapshot, snapshot)
+        worker.signals.finished.connect(lambda _: self._on_written(worker, snapshot['version']))
+        worker.signals.error.connect(lambda message: self._on_failed(worker, message))
+        self.worker = worker
+        self._discard_pending = False
+        self.pool.start(worker)
+
+    def wait(self):
+        """Дожидается фоновой записи снимка (при закрытии окна).
+
+        Иначе запоздавшая фоновая запись подменит файл более старым снимком
+        уже после синхронной записи или отложенного удаления.
+        """
+        if self.worker is None:
+            return
+        self.pool.waitForDone()
+        self.worker = None  # Сигнал о завершении придет позже и будет проигнорирован
+        if self._discard_pending:
+            self._discard_pending = False
+            self._remove_file()
+
+    def save_now(self, model, source):
+        """Синхронная запись снимка (при закрытии окна)"""
+        self.wait()
+        if not model.is_dirty():
+            return
+        try:
+            snapshot = self._snapshot(model, source)
+            self._write_snapshot(snapshot)
+            self.saved_version = snapshot['version']
+        except Exception as e:
+            print(f"Ошибка автосохранения: {e}")
+
+    def load(self):
+        """Возвращает снимок прошлого сеанса или None"""
+        if not os.path.exists(self.path):
+            return None
+        try:
+            with open(self.path, 'rb') as f:
+                return pickle.load(f)
+        except Exception as e:
+            print(f"Ошибка чтения автосохранения: {e}")
+            return None
+
+    def discard(self):
+        """Удаляет снимок после ручного сохранения"""
+        self.saved_version = None
+        if self.worker is not None:
+            self._discard_pending = True  # Файл удалим, когда запись завершится
+            return
+        self._remove_file()
+
+    def _snapshot(self, model, source):
+        data, (version, _) = model.snapshot()
+        return {
+            'source': source,
+            'version': version,
+            'saved_at': time.time(),
+            'data': data
+        }
+
+    def _write_snapshot(self, snapshot, progress_callback=None):
+        # Пишем во временный файл и подменяем, чтобы сбой не оставил обрывок
+        fd, tmp_path = tempfile.mkstemp(suffix=".tmp", dir=self.autosave_dir)
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                pickle.dump(snapshot, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp_path, self.path)
+        finally:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+
+    def _on_written(self, worker, version):
+        if worker is not self.worker:
+            return
+        self.worker = None
+        if self._discard_pending:
+            self._discard_pending = False
+            self._remove_file()
+        else:
+            self.saved_version = version
+
+    def _on_failed(self, worker, message):
+        if worker is self.worker:
+            self.worker = None
+            if self._discard_pending:
+                self._discard_pending = False
+                self._remove_file()
+        print(f"Ошибка автосохранения: {message}")
+
+    def _remove_file(self):
+        try:
+            os.remove(self.path)
+        except FileNotFoundError:
+            pass
+        except OSError as e:
+            print(f"Ошибка удаления автосохранения: {e}")
@@ -0,0 +1,71 @@
+import numpy as np
+import pandas as pd
+
+# Число единичных битов в каждом значении байта
+BYTE_COUNTS = np.unpackbits(np.arange(256, dtype=np.uint8)[:, None], axis=1).sum(axis=1)
+
+
+class BitmapIndex:
+    """Битовые индексы бинарных (0/1) столбцов набора данных.
+
+    Для каждого столбца, где встречаются только 0, 1 и пропуски, хранятся
+    упакованные битовые маски строк со значением 1, со значением 0 и с
+    пропуском — по биту на строку. Условия вида «столбец == 0/1» и их
+    сочетания через AND/OR/NOT вычисляются побитовыми операциями над
+    байтами, без просмотра самих данных.
+    """
+    def __init__(self, df: pd.DataFrame):
+        self.n_rows = len(df)
+        self._ones = {}
+        self._zeros = {}
+        self._nulls = {}
+        for col in df.columns:
+            series = df[col]
+            if not pd.api.types.is_numeric_dtype(series.dtype) or pd.api.types.is_bool_dtype(series.dtype):
+                continue
+            values = series.to_numpy(dtype=np.float64, na_value=np.nan)
+            ones = values == 1
+            zeros = values == 0
+            nulls = np.isnan(values)
+            if np.count_nonzero(ones) + np.count_nonzero(zeros) + np.count_nonzero(nulls) != len(values):
+                continue  # Не бинарный столбец
+            self._ones[col] = np.packbits(ones)
+            self._zeros[col] = np.packbits(zeros)
+            self._nulls[col] = np.packbits(nulls)
+
+    @property
+    def columns(self):
+        return list(self._ones)
+
+    def __contains__(self, column):
+        return column in self._ones
+
+    def lookup(self, column, value):
+        """Упакованная маска строк «column == value» или None, если индекс не поможет"""
+        if column not in self._ones or isinstance(value, str):
+            return None
+        if value == 1:
+            return self._ones[column]
+        if value == 0:
+            return self._zeros[column]
+        return np.zeros_like(self._ones[column])
+
+    def nulls(self, column):
+        return self._nulls.get(column)
+
+    @staticmethod
+    def invert(packed):
+        # Лишние биты в конце последнего байта отбрасываются при распаковке
+        return np.bitwise_not(packed)
+
+    def unpack(self, packed) -> np.ndarray:
+        """Булева маска строк из упакованной"""
+        return np.unpackbits(packed, count=self.n_rows).astype(bool)
+
+    def count(self, packed):
+        """Число строк в упакованной маске без распаковки"""
+        full, tail = divmod(self.n_rows, 8)
+        total = int(BYTE_COUNTS[packed[:full]].sum())
+        if tail:
+            total += int(BYTE_COUNTS[int(packed[full]) & (0xFF << (8 - tail)) & 0xFF])
+        return total
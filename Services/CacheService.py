@@ -0,0 +1,193 @@
+import os
+import sys
+import json
+import time
+import hashlib
+import pandas as pd
+
+try:
+    import pyarrow  # noqa: F401  (нужен для формата Feather)
+    HAS_ARROW = True
+except ImportError:
+    HAS_ARROW = False
+
+
+def get_app_dir():
+    """Возвращает папку рядом с exe или скриптом"""
+    if getattr(sys, 'frozen', False):
+        return os.path.dirname(sys.executable)
+    return os.path.abspath(".")
+
+
+def get_cache_dir():
+    """Возвращает путь к папке кэша рядом с exe или скриптом"""
+    return os.path.join(get_app_dir(), "cache")
+
+
+class DataCacheService:
+    """Дисковый кэш разобранных таблиц в бинарном колоночном формате"""
+    INDEX_FILE = "index.json"
+    HASH_CHUNK = 1024 * 1024
+
+    def __init__(self, cache_dir=None, max_size_mb=512):
+        self.cache_dir = cache_dir or get_cache_dir()
+        self.max_size = max_size_mb * 1024 * 1024
+        self.hits = 0
+        self.misses = 0
+        os.makedirs(self.cache_dir, exist_ok=True)
+        self._index = self._load_index()
+
+    def get(self, file_path, variant=""):
+        """Возвращает DataFrame из кэша или None, если файл изменился или не кэширован"""
+        try:
+            key = self.make_key(file_path, variant)
+        except OSError:
+            self.misses += 1
+            return None
+
+        entry = self._index.get(key)
+        cache_file = os.path.join(self.cache_dir, entry['file']) if entry else None
+        if cache_file is None or not os.path.exists(cache_file):
+            self._index.pop(key, None)
+            self.misses += 1
+            return None
+
+        try:
+            if entry['format'] == 'feather':
+                df = pd.read_feather(cache_file)
+            else:
+                df = pd.read_pickle(cache_file)
+        except Exception as e:
+            print(f"Ошибка чтения кэша: {e}")
+            self._remove_entry(key)
+            self._save_index()
+            self.misses += 1
+            return None
+
+        entry['last_access'] = time.time()
+        self._save_index()
+        self.hits += 1
+        return df
+
+    def put(self, file_path, df: pd.DataFrame, variant=""):
+        """Сохраняет разобранный DataFrame в кэш и применяет LRU-вытеснение"""
+        try:
+            key = self.make_key(file_path, variant)
+        except OSError:
+            return
+
+        source = os.path.abspath(file_path)
+        # Старые версии того же файла больше не понадобятся
+        for old_key in [k for k, e in self._index.items()
+                        if e['source'] == source and e['variant'] == variant and k != key]:
+            self._remove_entry(old_key)
+
+        file_format, cache_file = self._write(key, df)
+        if cache_file is None:
+            return
+
+        self._index[key] = {
+            'file': os.path.basename(cache_file),
+            'format': file_format,
+            'source': source,
+            'variant': variant,
+            'size': os.path.getsize(cache_file),
+            'last_access': time.time()
+        }
+        self._evict()
+        self._save_index()
+
+    def clear(self):
+        """Полная очистка кэша"""
+        for key in list(self._index):
+            self._remove_entry(key)
+        self._save_index()
+
+    def get_stats(self):
+        """Счетчики попаданий/промахов и текущий размер кэша"""
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'entries': len(self._index),
+            'size': sum(e['size'] for e in self._index.values()),
+            'max_size': self.max_size
+        }
+
+    def make_key(self, file_path, variant=""):
+        """Ключ кэша: путь, размер, время изменения и хэш содержимого файла"""
+        stat = os.stat(file_path)
+        raw = "|".join([
+            os.path.abspath(file_path),
+            str(stat.st_size),
+            str(stat.st_mtime_ns),
+            self._hash_file(file_path),
+            variant
+        ])
+        return hashlib.sha1(raw.encode('utf-8')).hexdigest()
+
+    def _hash_file(self, file_path):
+        h = hashlib.blake2b(digest_size=16)
+        with open(file_path, 'rb') as f:
+            while True:
+                chunk = f.read(self.HASH_CHUNK)
+                if not chunk:
+                    break
+                h.update(chunk)
+        return h.hexdigest()
+
+    def _write(self, key, df):
+        # Feather требует строковые имена столбцов и RangeIndex,
+        # при любой несовместимости откатываемся на pickle
+        if HAS_ARROW and all(isinstance(col, str) for col in df.columns):
+            cache_file = os.path.join(self.cache_dir, key + ".feather")
+            try:
+                df.reset_index(drop=True).to_feather(cache_file)
+                return 'feather', cache_file
+            except Exception:
+                if os.path.exists(cache_file):
+                    os.remove(cache_file)
+
+        cache_file = os.path.join(self.cache_dir, key + ".pkl")
+        try:
+            df.to_pickle(cache_file)
+            return 'pickle', cache_file
+        except Exception as e:
+            print(f"Ошибка записи кэша: {e}")
+            return None, None
+
+    def _evict(self):
+        total = sum(e['size'] for e in self._index.values())
+        for key, entry in sorted(self._index.items(), key=lambda item: item[1]['last_access']):
+            if total <= self.max_size:
+                break
+            total -= entry['size']
+            self._remove_entry(key)
+
+    def _remove_entry(self, key):
+        entry = self._index.pop(key, None)
+        if entry is None:
+            return
+        try:
+            os.remove(os.path.join(self.cache_dir, entry['file']))
+        except OSError:
+            pass
+
+    def _load_index(self):
+        index_path = os.path.join(self.cache_dir, self.INDEX_FILE)
+        if not os.path.exists(index_path):
+            return {}
+        try:
+            with open(index_path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def _save_index(self):
+        index_path = os.path.join(self.cache_dir, self.INDEX_FILE)
+        tmp_path = index_path + ".tmp"
+        try:
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(self._index, f, ensure_ascii=False)
+            os.replace(tmp_path, index_path)
+        except OSError as e:
+            print(f"Ошибка сохранения индекса кэша: {e}")
@@ -7,6 +7,8 @@ from google.auth.transport.requests import Request
 from google_auth_oauthlib.flow import InstalledAppFlow
 from googleapiclient.discovery import build
 from googleapiclient.http import MediaFileUpload, MediaIoBaseDownload
+from Services.DatasetLoader import DatasetLoader
+from Services.ExportService import ExportService
 from PySide6.QtWidgets import (QInputDialog, QMessageBox, QComboBox, QDialog, QVBoxLayout, QPushButton, QLabel)
 import socket
 import requests
@@ -118,7 +120,7 @@ class GoogleDriveService:
             QMessageBox.critical(self.parent_ui, "Ошибка", f"Ошибка при получении файлов: {e}")
             return []
 
-    def load_from_cloud(self):
+    def load_from_cloud(self, loader: DatasetLoader = None):
         """Загружает выбранный файл с Google Диска."""
         files = self.get_available_files()
         if not files:
@@ -155,7 +157,7 @@ class GoogleDriveService:
                     break
 
             fh.seek(0)
-            self.data = pd.read_excel(fh)
+            self.data = (loader or DatasetLoader()).load(fh)
             return self.data, selected_file, None
         else:
             return None, None, "Загрузка отменена."
@@ -200,8 +202,7 @@ class GoogleDriveService:
 
             try:
                 temp_file = "temp_dataframe.xlsx"
-                with pd.ExcelWriter(temp_file, engine='openpyxl') as writer:
-                    self.data.to_excel(writer, index=False)
+                ExportService().write(self.data, temp_file)
 
                 media = MediaFileUpload(
                     temp_file,
@@ -0,0 +1,187 @@
+import os
+import numpy as np
+import pandas as pd
+from openpyxl import load_workbook
+from Services.SqliteStorage import SqliteStorage, SQLITE_SIGNATURE
+from Services.SpreadsheetReader import SpreadsheetReader
+from Services.JournalService import ChangeJournal
+
+CSV_CHUNK_ROWS = 50000
+
+XLSX_SIGNATURE = b'PK\x03\x04'
+XLS_SIGNATURE = b'\xd0\xcf\x11\xe0\xa1\xb1\x1a\xe1'
+
+
+def get_memory_report(before: pd.DataFrame, after: pd.DataFrame) -> pd.DataFrame:
+    """Отчет о занимаемой памяти по столбцам до и после применения схемы"""
+    bytes_before = before.memory_usage(index=False, deep=True)
+    bytes_after = after.memory_usage(index=False, deep=True)
+    report = pd.DataFrame({
+        "Тип до": before.dtypes.astype(str),
+        "Тип после": after.dtypes.astype(str),
+        "Байт до": bytes_before,
+        "Байт после": bytes_after,
+    })
+    report.loc["Итого"] = ["", "", bytes_before.sum(), bytes_after.sum()]
+    return report
+
+
+class DatasetLoader:
+    """Однократное чтение набора данных с определением формата и схемой типов.
+
+    Используется обоими режимами и загрузкой из Google Диска. Схема dtype
+    применяется прямо при разборе файла, поэтому повторное чтение или
+    последующее приведение типов не требуется. Функция schema (например,
+    apply_schema модели) вызывается после разбора для компактных типов.
+    Excel читается через SpreadsheetReader самым быстрым доступным движком.
+
+    Правки режима редактирования, сохраненные в журнал рядом с файлом
+    (ChangeJournal) и еще не объединенные с ним, применяются к прочитанным
+    данным. replay_journal=False — читать только сам файл (режим
+    редактирования применяет журнал к своей модели сам).
+    """
+    def __init__(self, dtype=None, cache_service=None, schema=None, reader=None, replay_journal=True):
+        self.dtype = dtype or {}
+        self.cache_service = cache_service
+        self.schema = schema
+        self.reader = reader or SpreadsheetReader()
+        self.replay_journal = replay_journal
+        self.memory_report = None
+
+    def load(self, source, progress_callback=None, usecols=None, nrows=None, fraction=None) -> pd.DataFrame:
+        """Читает файл (путь или файловый объект) и возвращает DataFrame.
+
+        usecols — загружать только эти столбцы, nrows — только первые строки,
+        fraction — случайную долю строк. Отбор выполняется при разборе файла,
+        пропущенные строки и столбцы в память не попадают. Журнал изменений
+        применяется только при чтении всех строк: номера строк в его операциях
+        относятся к полному набору.
+        """
+        progress = progress_callback or (lambda percent, message="": None)
+        is_path = isinstance(source, (str, os.PathLike))
+        # Предпросмотр (часть строк) в кэш не попадает, чтобы не подменить полный набор
+        use_cache = is_path and self.cache_service is not None and nrows is None and fraction is None
+        journal = ChangeJournal(os.fspath(source)) if is_path and self.replay_journal else None
+        if journal is not None and (nrows is not None or fraction is not None or not journal.exists()):
+            journal = None
+
+        if use_cache:
+            progress(0, "Проверка кэша...")
+            data = self.cache_service.get(source, self._cache_variant(usecols, journal))
+            if data is not None:
+                return data
+
+        file_format = self.sniff_format(source)
+        if file_format == 'csv':
+            data = self._read_csv(source, progress, usecols, nrows, fraction)
+        elif file_format == 'sqlite':
+            data = self._read_sqlite(source, progress, usecols, nrows, fraction)
+        else:
+            progress(10, "Чтение Excel файла...")
+            data = self.reader.read(source, file_format, dtype=self.dtype or None, usecols=usecols,
+                                    nrows=nrows, skiprows=self._sample_rows(fraction))
+
+        if data.empty or len(data.columns) == 0:
+            raise ValueError("Файл не содержит данных")
+
+        if journal is not None:
+            progress(90, "Применение журнала изменений...")
+            data = journal.apply(data, None if usecols is None else self.read_columns(source))
+
+        if self.schema is not None:
+            progress(92, "Приведение типов...")
+            raw_data = data
+            data = self.schema(raw_data)
+            self.memory_report = get_memory_report(raw_data, data)
+
+        if use_cache:
+            progress(95, "Сохранение в кэш...")
+            self.cache_service.put(source, data, self._cache_variant(usecols, journal))
+
+        progress(100, "Готово")
+        return data
+
+    @classmethod
+    def read_columns(cls, file_path):
+        """Имена столбцов файла без чтения данных"""
+        file_format = cls.sniff_format(file_path)
+        if file_format == 'csv':
+            return list(pd.read_csv(file_path, encoding='utf-8-sig', nrows=0).columns)
+        if file_format == 'sqlite':
+            storage = SqliteStorage(file_path, read_only=True)
+            try:
+                return list(storage.columns)
+            finally:
+                storage.close()
+        if file_format == 'xlsx':
+            wb = load_workbook(file_path, read_only=True)
+            try:
+                header = next(wb.active.iter_rows(max_row=1, values_only=True), ())
+            finally:
+                wb.close()
+            return [value for value in header if value is not None]
+        return list(SpreadsheetReader().read(file_path, file_format, nrows=0).columns)
+
+    @staticmethod
+    def sniff_format(source):
+        """Определяет формат по сигнатуре файла: 'xlsx', 'xls', 'sqlite' или 'csv'"""
+        if isinstance(source, (str, os.PathLike)):
+            with open(source, 'rb') as f:
+                header = f.read(len(SQLITE_SIGNATURE))
+        else:
+            position = source.tell()
+            header = source.read(len(SQLITE_SIGNATURE))
+            source.seek(position)
+
+        if header.startswith(XLSX_SIGNATURE):
+            return 'xlsx'
+        if header.startswith(XLS_SIGNATURE):
+            return 'xls'
+        if header == SQLITE_SIGNATURE:
+            return 'sqlite'
+        if b'\x00' in header:
+            raise ValueError("Неподдерживаемый формат файла")
+        return 'csv'
+
+    def _read_csv(self, source, progress, usecols=None, nrows=None, fraction=None):
+        # CSV читаем порциями, чтобы показывать прогресс и проверять отмену
+        options = dict(usecols=usecols, nrows=nrows, skiprows=self._sample_rows(fraction))
+        if isinstance(source, (str, os.PathLike)):
+            with open(source, 'rb') as f:
+                return self._read_csv_chunks(f, os.path.getsize(source), progress, **options)
+        return self._read_csv_chunks(source, None, progress, **options)
+
+    def _read_sqlite(self, source, progress, usecols=None, nrows=None, fraction=None):
+        # База SQLite читается только с диска, соединение живет в текущем потоке
+        if not isinstance(source, (str, os.PathLike)):
+            raise ValueError("Базу данных SQLite можно открыть только из файла")
+        progress(10, "Чтение базы данных...")
+        storage = SqliteStorage(source, read_only=True)
+        try:
+            return storage.read_frame(usecols, nrows, fraction)
+        finally:
+            storage.close()
+
+    def _read_csv_chunks(self, f, total_size, progress, **options):
+        chunks = []
+        reader = pd.read_csv(f, encoding='utf-8-sig', chunksize=CSV_CHUNK_ROWS, dtype=self.dtype or None,
+                             **options)
+        for chunk in reader:
+            chunks.append(chunk)
+            if total_size:
+                progress(10 + 80 * min(f.tell() / total_size, 1.0), "Чтение CSV файла...")
+        return pd.concat(chunks, ignore_index=True) if chunks else pd.DataFrame()
+
+    @staticmethod
+    def _sample_rows(fraction):
+        """Функция skiprows для случайной выборки строк (заголовок сохраняется)"""
+        if fraction is None:
+            return None
+        rng = np.random.default_rng()
+        return lambda i: i > 0 and rng.random() >= fraction
+
+    def _cache_variant(self, usecols=None, journal=None):
+        # Состояние журнала входит в ключ: новая правка делает кэш неактуальным
+        return repr((sorted(self.dtype.items()), getattr(self.schema, '__name__', None),
+                     None if usecols is None else sorted(usecols),
+                     None if journal is None else journal.signature()))
@@ -0,0 +1,76 @@
+import os
+import pandas as pd
+from openpyxl import Workbook
+from EditingMode.OsteoartritModel import exact_floats
+
+EXPORT_CHUNK_ROWS = 5000
+
+
+class ExportService:
+    """Потоковая запись таблиц в Excel и CSV с постоянным расходом памяти.
+
+    Excel пишется через режим write_only openpyxl: строки уходят во
+    временный поток листа порциями по chunk_rows и не образуют дерево
+    ячеек в памяти. Данные сначала записываются во временный файл рядом
+    с целевым, поэтому прерванное сохранение не портит исходный файл.
+    """
+    def __init__(self, chunk_rows=EXPORT_CHUNK_ROWS):
+        self.chunk_rows = chunk_rows
+
+    def write(self, df: pd.DataFrame, file_path, index=False, progress_callback=None):
+        """Сохраняет DataFrame в файл; формат определяется по расширению"""
+        progress = progress_callback or (lambda percent, message="": None)
+        root, ext = os.path.splitext(file_path)
+        tmp_path = root + ".tmp" + ext
+        try:
+            if ext.lower() == '.csv':
+                self._write_csv(df, tmp_path, index, progress)
+            else:
+                self._write_excel(df, tmp_path, index, progress)
+            os.replace(tmp_path, file_path)
+        finally:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+        progress(100, "Готово")
+        return file_path
+
+    def _write_excel(self, df, file_path, index, progress):
+        wb = Workbook(write_only=True)
+        ws = wb.create_sheet()
+
+        header = [str(col) for col in df.columns]
+        if index:
+            header.insert(0, df.index.name or "")
+        ws.append(header)
+
+        total = len(df)
+        for start, chunk in self._iter_chunks(df):
+            columns = [self._to_cells(chunk[col]) for col in chunk.columns]
+            if index:
+                columns.insert(0, self._to_cells(chunk.index.to_series()))
+            for row in zip(*columns):
+                ws.append(row)
+            progress(90 * (start + len(chunk)) / max(total, 1), "Запись Excel файла...")
+
+        progress(95, "Сохранение файла...")
+        wb.save(file_path)
+
+    def _write_csv(self, df, file_path, index, progress):
+        total = len(df)
+        with open(file_path, 'w', encoding='utf-8', newline='') as f:
+            for start, chunk in self._iter_chunks(df):
+                chunk.to_csv(f, index=index, header=(start == 0))
+                progress(95 * (start + len(chunk)) / max(total, 1), "Запись CSV файла...")
+            if total == 0:
+                df.to_csv(f, index=index)
+
+    def _iter_chunks(self, df):
+        for start in range(0, len(df), self.chunk_rows):
+            yield start, df.iloc[start:start + self.chunk_rows]
+
+    @staticmethod
+    def _to_cells(series):
+        # Пропуски записываются пустыми ячейками, numpy-типы — обычными числами,
+        # float32 — своей десятичной записью (170.3, а не 170.3000030517578)
+        series = exact_floats(series)
+        return series.astype(object).where(series.notna(), None).tolist()
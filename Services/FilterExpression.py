@@ -0,0 +1,259 @@
+import re
+import time
+import operator as op
+from functools import reduce
+import numpy as np
+import pandas as pd
+
+# Лексемы: строка в одинарных кавычках, имя столбца в [скобках] или "кавычках",
+# число, оператор сравнения, скобки и запятая, слово
+TOKEN_RE = re.compile(r"""
+    \s*(?:
+        (?P<string>'(?:[^']|'')*')
+      | (?P<column>\[[^\]]+\]|"[^"]+")
+      | (?P<number>-?\d+(?:\.\d+)?(?![\w.]))
+      | (?P<op><=|>=|<>|!=|==|=|<|>)
+      | (?P<punct>[(),])
+      | (?P<word>[^\s()',=<>!\[\]"]+)
+    )""", re.VERBOSE)
+
+COMPARISONS = {
+    "=": op.eq, "==": op.eq,
+    "!=": op.ne, "<>": op.ne,
+    "<": op.lt, "<=": op.le,
+    ">": op.gt, ">=": op.ge,
+}
+# Операторы, которые SortedIndex разрешает поиском по диапазону
+RANGE_OPERATORS = {op.eq: "==", op.lt: "<", op.le: "<=", op.gt: ">", op.ge: ">="}
+
+KEYWORDS = {"AND", "OR", "NOT", "IN", "BETWEEN", "IS", "NULL", "CONTAINS"}
+
+
+def tokenize(text):
+    tokens = []
+    position = 0
+    text = text.rstrip()
+    while position < len(text):
+        match = TOKEN_RE.match(text, position)
+        if match is None or match.end() == position:
+            raise ValueError(f"Непонятный фрагмент выражения: {text[position:position + 20]!r}")
+        position = match.end()
+        kind = match.lastgroup
+        value = match.group(kind)
+        if kind == 'string':
+            value = value[1:-1].replace("''", "'")
+        elif kind == 'column':
+            value = value[1:-1]
+        elif kind == 'number':
+            value = float(value) if '.' in value else int(value)
+        elif kind == 'word' and value.upper() in KEYWORDS:
+            kind, value = 'keyword', value.upper()
+        tokens.append((kind, value))
+    return tokens
+
+
+class FilterExpression:
+    """Составное условие фильтра, разобранное один раз.
+
+    Синтаксис: условия над столбцами, объединенные AND / OR / NOT и скобками.
+    Условия: [Столбец] > 25, Врач IN (1, 2), Возраст BETWEEN 30 AND 50,
+    Рост IS NULL, Рост IS NOT NULL, [Столбец] CONTAINS 'текст'.
+    Имена столбцов с пробелами и знаками пишутся в [скобках] или "кавычках",
+    строки — в 'одинарных кавычках'.
+
+    evaluate() вычисляет всю маску векторно за один проход по дереву:
+    каждое условие — одна операция над столбцом, логика — операции над
+    булевыми массивами на месте. Время последнего вычисления — в elapsed.
+    Если передан BitmapIndex, условия «бинарный столбец == 0/1» и их
+    сочетания вычисляются побитово по индексу, без обращения к столбцам,
+    с SortedIndex сравнения числовых столбцов и BETWEEN — двоичным поиском,
+    а со StringIndex CONTAINS проверяет только различные значения столбца.
+    """
+    def __init__(self, text):
+        self.text = text
+        self._tokens = tokenize(text)
+        if not self._tokens:
+            raise ValueError("Пустое выражение фильтра")
+        self._position = 0
+        self.columns = []
+        self.tree = self._parse_or()
+        if self._position < len(self._tokens):
+            raise ValueError(f"Лишний фрагмент в конце выражения: {self._tokens[self._position][1]}")
+        self.elapsed = None
+
+    def evaluate(self, df: pd.DataFrame, index=None, ranges=None, strings=None) -> np.ndarray:
+        """Булева маска строк df, удовлетворяющих выражению.
+
+        index — BitmapIndex, ranges — SortedIndex, strings — StringIndex по тому же df.
+        """
+        missing = [col for col in self.columns if col not in df.columns]
+        if missing:
+            raise ValueError(f"Столбцы не найдены: {', '.join(missing)}")
+        start = time.perf_counter()
+        mask = self._evaluate(self.tree, df, index, ranges, strings)
+        self.elapsed = time.perf_counter() - start
+        return mask
+
+    def packed(self, index):
+        """Упакованная маска всего выражения по BitmapIndex или None,
+        если в нем есть условия, которые индекс не покрывает"""
+        missing = [col for col in self.columns if col not in index]
+        return None if missing else self._indexed(self.tree, index)
+
+    # Разбор: or -> and (OR and)*, and -> not (AND not)*, not -> NOT not | primary
+    def _peek(self):
+        return self._tokens[self._position] if self._position < len(self._tokens) else (None, None)
+
+    def _next(self):
+        token = self._peek()
+        if token[0] is None:
+            raise ValueError("Выражение фильтра оборвано")
+        self._position += 1
+        return token
+
+    def _accept(self, kind, value=None):
+        token = self._peek()
+        if token[0] == kind and (value is None or token[1] == value):
+            self._position += 1
+            return True
+        return False
+
+    def _expect(self, kind, value):
+        if not self._accept(kind, value):
+            found = self._peek()[1]
+            raise ValueError(f"Ожидалось «{value}», найдено «{'конец выражения' if found is None else found}»")
+
+    def _parse_or(self):
+        nodes = [self._parse_and()]
+        while self._accept('keyword', 'OR'):
+            nodes.append(self._parse_and())
+        return nodes[0] if len(nodes) == 1 else ('or', nodes)
+
+    def _parse_and(self):
+        nodes = [self._parse_not()]
+        while self._accept('keyword', 'AND'):
+            nodes.append(self._parse_not())
+        return nodes[0] if len(nodes) == 1 else ('and', nodes)
+
+    def _parse_not(self):
+        if self._accept('keyword', 'NOT'):
+            return ('not', self._parse_not())
+        if self._accept('punct', '('):
+            node = self._parse_or()
+            self._expect('punct', ')')
+            return node
+        return self._parse_condition()
+
+    def _parse_condition(self):
+        kind, column = self._next()
+        if kind not in ('column', 'word'):
+            raise ValueError(f"Ожидалось имя столбца, найдено «{column}»")
+        column = str(column)
+        if column not in self.columns:
+            self.columns.append(column)
+
+        kind, value = self._next()
+        if kind == 'op':
+            return ('compare', column, COMPARISONS[value], self._parse_value())
+        if kind != 'keyword':
+            raise ValueError(f"Ожидался оператор после «{column}», найдено «{value}»")
+
+        negate = value == 'NOT'
+        if negate:
+            kind, value = self._next()
+        if value == 'IN':
+            self._expect('punct', '(')
+            values = [self._parse_value()]
+            while self._accept('punct', ','):
+                values.append(self._parse_value())
+            self._expect('punct', ')')
+            node = ('in', column, values)
+        elif value == 'BETWEEN':
+            low = self._parse_value()
+            self._expect('keyword', 'AND')
+            node = ('between', column, low, self._parse_value())
+        elif value == 'CONTAINS':
+            node = ('contains', column, str(self._parse_value()))
+        elif value == 'IS' and not negate:
+            negate = self._accept('keyword', 'NOT')
+            self._expect('keyword', 'NULL')
+            node = ('null', column)
+        else:
+            raise ValueError(f"Неизвестный оператор «{value}»")
+        return ('not', node) if negate else node
+
+    def _parse_value(self):
+        kind, value = self._next()
+        if kind in ('string', 'number'):
+            return value
+        if kind == 'word':
+            return value  # Строка без кавычек
+        raise ValueError(f"Ожидалось значение, найдено «{value}»")
+
+    def _evaluate(self, node, df, index=None, ranges=None, strings=None):
+        if index is not None:
+            packed = self._indexed(node, index)
+            if packed is not None:
+                return index.unpack(packed)
+
+        kind = node[0]
+        if kind == 'and' or kind == 'or':
+            combine = np.logical_and if kind == 'and' else np.logical_or
+            mask = self._evaluate(node[1][0], df, index, ranges, strings)
+            for child in node[1][1:]:
+                # Короткое замыкание: дальше маска уже не изменится
+                if kind == 'and' and not mask.any() or kind == 'or' and mask.all():
+                    break
+                combine(mask, self._evaluate(child, df, index, ranges, strings), out=mask)
+            return mask
+        if kind == 'not':
+            return np.logical_not(self._evaluate(node[1], df, index, ranges, strings))
+        if kind == 'contains' and strings is not None:
+            return strings.contains_mask(node[1], node[2])
+
+        if ranges is not None:
+            if kind == 'compare' and node[2] in RANGE_OPERATORS and ranges.supports(node[1], node[3]):
+                return ranges.compare_mask(node[1], RANGE_OPERATORS[node[2]], node[3])
+            if (kind == 'between' and ranges.supports(node[1], node[2])
+                    and ranges.supports(node[1], node[3])):
+                return ranges.mask(node[1], node[2], node[3])
+
+        series = df[node[1]]
+        if kind == 'compare':
+            result = node[2](series, node[3])
+        elif kind == 'in':
+            result = series.isin(node[2])
+        elif kind == 'between':
+            result = (series >= node[2]) & (series <= node[3])
+        elif kind == 'contains':
+            result = series.astype(str).str.contains(node[2], case=False, regex=False, na=False)
+        else:
+            return series.isna().to_numpy(dtype=bool, copy=True)
+        # Семантика pandas, а не SQL: =, <, >, IN, BETWEEN с пропуском дают ложь,
+        # а != и NOT — истину (NaN != 0 истинно); индексы повторяют это поведение
+        return result.fillna(False).to_numpy(dtype=bool, copy=True)
+
+    def _indexed(self, node, index):
+        """Упакованная маска узла по битовому индексу или None, если индекс не подходит"""
+        kind = node[0]
+        if kind == 'and' or kind == 'or':
+            parts = [self._indexed(child, index) for child in node[1]]
+            if any(part is None for part in parts):
+                return None
+            return reduce(np.bitwise_and if kind == 'and' else np.bitwise_or, parts)
+        if kind == 'not':
+            part = self._indexed(node[1], index)
+            return None if part is None else index.invert(part)
+        if kind == 'compare' and node[2] in (op.eq, op.ne):
+            part = index.lookup(node[1], node[3])
+            if part is None or node[2] is op.eq:
+                return part
+            return index.invert(part)
+        if kind == 'in':
+            parts = [index.lookup(node[1], value) for value in node[2]]
+            if any(part is None for part in parts):
+                return None
+            return reduce(np.bitwise_or, parts)
+        if kind == 'null':
+            return index.nulls(node[1])
+        return None
@@ -0,0 +1,158 @@
+import operator as op
+import numpy as np
+import pandas as pd
+from Services.BitmapIndex import BitmapIndex
+from Services.SortedIndex import SortedIndex
+from Services.StringIndex import StringIndex
+
+# Операторы сравнения диалога фильтрации
+COMPARISONS = {
+    ">": op.gt,
+    ">=": op.ge,
+    "==": op.eq,
+    "<=": op.le,
+    "<": op.lt,
+    "!=": op.ne,
+}
+
+
+def parse_value(value):
+    """Значение фильтра: число, если строка его содержит, иначе строка"""
+    try:
+        return float(value) if '.' in value else int(value)
+    except ValueError:
+        return value  # Оставляем как строку, если не число
+
+
+class FilteredDataset:
+    """Набор данных с фильтром в виде булевой маски строк.
+
+    Исходный DataFrame не копируется и не изменяется: фильтр хранится
+    как маска (байт на строку), таблица показывает строки по номерам,
+    а отфильтрованный DataFrame для расчетов создается только по запросу
+    и живет до следующего изменения фильтра. Сброс фильтра — это сброс маски.
+
+    Фильтр — стек шагов (описание, маска условия по исходным данным).
+    Итоговая маска — AND масок всех шагов, поэтому любой шаг можно убрать,
+    не вычисляя условия остальных шагов заново.
+    Для бинарных столбцов при загрузке строится BitmapIndex, для условий
+    на диапазон числовых столбцов — SortedIndex, для поиска подстроки —
+    StringIndex (оба заполняются по столбцу при первом запросе).
+    """
+    def __init__(self, base: pd.DataFrame):
+        self.base = base
+        self.steps = []  # [(описание, маска условия)]
+        self.mask = None  # AND масок шагов; None — фильтра нет
+        self._frame = None
+        self._packed_mask = None
+        self.bitmap_index = BitmapIndex(base)
+        self.sorted_index = SortedIndex(base)
+        self.string_index = StringIndex(base)
+
+    @property
+    def is_filtered(self):
+        return self.mask is not None
+
+    @property
+    def columns(self):
+        return self.base.columns
+
+    def row_count(self):
+        return len(self.base) if self.mask is None else int(np.count_nonzero(self.mask))
+
+    def rows(self):
+        """Номера строк исходных данных, прошедших фильтр (None — все строки)"""
+        return None if self.mask is None else np.flatnonzero(self.mask)
+
+    def frame(self) -> pd.DataFrame:
+        """DataFrame с учетом фильтра; без фильтра — исходные данные"""
+        if self.mask is None:
+            return self.base
+        if self._frame is None:
+            self._frame = self.base[self.mask]
+        return self._frame
+
+    def condition_mask(self, column, operator, value):
+        """Маска строк исходных данных, удовлетворяющих условию диалога фильтрации"""
+        if operator in ("==", "!=") and column in self.bitmap_index:
+            packed = self.bitmap_index.lookup(column, parse_value(value))
+            if packed is not None:
+                if operator == "!=":
+                    packed = self.bitmap_index.invert(packed)
+                return self.bitmap_index.unpack(packed)
+
+        if operator in (">", ">=", "==", "<=", "<") and self.sorted_index.supports(column, parse_value(value)):
+            return self.sorted_index.compare_mask(column, operator, parse_value(value))
+
+        if operator == "содержит":
+            return self.string_index.contains_mask(column, value)
+
+        result = COMPARISONS[operator](self.base[column], parse_value(value))
+        return result.fillna(False).to_numpy(dtype=bool)
+
+    def expression_mask(self, expression):
+        """Маска строк исходных данных для FilterExpression"""
+        return expression.evaluate(self.base, self.bitmap_index, self.sorted_index, self.string_index)
+
+    def count(self, mask):
+        """Число строк, которое останется после применения маски"""
+        if self.mask is not None:
+            return int(np.count_nonzero(self.mask & mask))
+        return int(np.count_nonzero(mask))
+
+    def expression_count(self, expression):
+        """Число строк после применения выражения (для счетчика в диалоге).
+
+        Выражение только над бинарными столбцами считается по упакованным
+        маскам BitmapIndex без распаковки; остальные — через полную маску.
+        """
+        packed = expression.packed(self.bitmap_index)
+        if packed is None:
+            return self.count(self.expression_mask(expression))
+        if self.mask is not None:
+            if self._packed_mask is None:
+                self._packed_mask = np.packbits(self.mask)
+            packed = packed & self._packed_mask
+        return self.bitmap_index.count(packed)
+
+    def apply(self, mask, description=""):
+        """Добавляет шаг фильтра; пустой результат не применяется.
+
+        Возвращает число строк после фильтрации или 0, если условию
+        не удовлетворяет ни одна из видимых строк.
+        """
+        combined = mask if self.mask is None else self.mask & mask
+        if not combined.any():
+            return 0
+        self.steps.append((description, mask))
+        self.mask = combined
+        self._frame = None
+        self._packed_mask = None
+        return self.row_count()
+
+    def remove_step(self, position):
+        """Убирает шаг фильтра; маска собирается из сохраненных масок остальных шагов"""
+        del self.steps[position]
+        self._combine()
+        return self.row_count()
+
+    def undo(self):
+        """Отменяет последний шаг фильтра"""
+        if self.steps:
+            self.remove_step(len(self.steps) - 1)
+
+    def reset(self):
+        self.steps = []
+        self.mask = None
+        self._frame = None
+        self._packed_mask = None
+
+    def _combine(self):
+        self._frame = None
+        self._packed_mask = None
+        if not self.steps:
+            self.mask = None
+            return
+        self.mask = self.steps[0][1].copy()
+        for _, mask in self.steps[1:]:
+            np.logical_and(self.mask, mask, out=self.mask)
@@ -0,0 +1,84 @@
+import os
+from concurrent.futures import ProcessPoolExecutor, as_completed
+import pandas as pd
+from EditingMode.OsteoartritModel import COLUMN_DTYPES, apply_schema, resolve_columns
+from Services.DatasetLoader import DatasetLoader
+from Services.LoadWorker import LoadCancelled
+
+SOURCE_COLUMN = "Источник"
+WORKBOOK_EXTENSIONS = ('.xlsx', '.xls', '.csv')
+
+
+def parse_workbook(file_path):
+    """Разбор одного файла врача в дочернем процессе.
+
+    Возвращает (путь, DataFrame или None, текст ошибки). Столбцы приводятся
+    к именам модели, чтобы файлы с разным написанием заголовков склеивались.
+    """
+    try:
+        df = DatasetLoader(schema=apply_schema).load(file_path)
+        model_columns = list(COLUMN_DTYPES)
+        actual = resolve_columns(df, model_columns)
+        df = df[actual].set_axis(model_columns, axis=1)
+        df.insert(0, SOURCE_COLUMN, os.path.basename(file_path))
+        return file_path, df, None
+    except KeyError as e:
+        return file_path, None, e.args[0]
+    except Exception as e:
+        return file_path, None, str(e)
+
+
+class FolderIngestService:
+    """Параллельная загрузка папки с файлами врачей в один набор данных.
+
+    Каждый файл разбирается в отдельном процессе (openpyxl занимает GIL,
+    поэтому потоки здесь не помогают), проверяется по схеме OsteoartritModel
+    и получает столбец «Источник» с именем файла. Файлы, не прошедшие
+    проверку, не попадают в результат и перечисляются в отчете.
+    """
+    def __init__(self, max_workers=None):
+        self.max_workers = max_workers or os.cpu_count() or 1
+
+    @staticmethod
+    def list_workbooks(folder):
+        return sorted(
+            os.path.join(folder, name) for name in os.listdir(folder)
+            if name.lower().endswith(WORKBOOK_EXTENSIONS) and not name.startswith('~$')
+        )
+
+    def load_folder(self, folder, progress_callback=None):
+        """Возвращает (объединенный DataFrame, {файл: причина отказа})"""
+        progress = progress_callback or (lambda percent, message="": None)
+        files = self.list_workbooks(folder)
+        if not files:
+            raise ValueError("В папке нет файлов Excel или CSV")
+
+        frames = {}
+        rejected = {}
+        progress(0, f"Разбор файлов: 0 из {len(files)}")
+        executor = ProcessPoolExecutor(max_workers=min(self.max_workers, len(files)))
+        try:
+            futures = [executor.submit(parse_workbook, path) for path in files]
+            for done, future in enumerate(as_completed(futures), start=1):
+                path, df, error = future.result()
+                if error is None:
+                    frames[path] = df
+                else:
+                    rejected[os.path.basename(path)] = error
+                progress(90 * done / len(files), f"Разбор файлов: {done} из {len(files)}")
+        except LoadCancelled:
+            executor.shutdown(wait=False, cancel_futures=True)
+            raise
+        else:
+            executor.shutdown()
+
+        if not frames:
+            raise ValueError("Ни один файл не соответствует схеме данных:\n" +
+                             "\n".join(f"{name}: {error}" for name, error in rejected.items()))
+
+        progress(95, "Объединение данных...")
+        # Порядок строк не зависит от того, какой процесс закончил раньше
+        data = pd.concat([frames[path] for path in files if path in frames], ignore_index=True)
+        data = apply_schema(data)
+        progress(100, "Готово")
+        return data, rejected
@@ -0,0 +1,106 @@
+import os
+import json
+import numpy as np
+import pandas as pd
+
+JOURNAL_SUFFIX = ".journal"
+
+
+def _to_builtin(value):
+    """Преобразует типы numpy в обычные типы Python для JSON"""
+    if isinstance(value, np.generic):
+        return value.item()
+    raise TypeError(f"Тип {type(value).__name__} не поддерживается журналом")
+
+
+class ChangeJournal:
+    """Журнал изменений записей, дописываемый рядом с файлом данных.
+
+    Каждая операция add/update/delete хранится отдельной строкой JSON,
+    поэтому сохранение занимает время, пропорциональное числу правок,
+    а не размеру таблицы. Основной файл перезаписывается только при
+    объединении журнала (compact) в презентере.
+    """
+    def __init__(self, data_path):
+        self.data_path = data_path
+        self.path = data_path + JOURNAL_SUFFIX
+
+    def exists(self):
+        return os.path.exists(self.path) and os.path.getsize(self.path) > 0
+
+    def append(self, changes):
+        """Дописывает операции в конец журнала"""
+        if not changes:
+            return
+        with open(self.path, 'a', encoding='utf-8') as f:
+            for change in changes:
+                f.write(json.dumps(change, ensure_ascii=False, default=_to_builtin) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+
+    def read(self):
+        """Читает операции журнала по порядку"""
+        if not self.exists():
+            return []
+        entries = []
+        with open(self.path, 'r', encoding='utf-8') as f:
+            for line in f:
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    entries.append(json.loads(line))
+                except ValueError:
+                    break  # Оборванная последняя строка после сбоя
+        return entries
+
+    def replay(self, model):
+        """Применяет операции журнала к модели; возвращает их количество"""
+        entries = self.read()
+        for entry in entries:
+            if entry['op'] == 'add':
+                model.add_row(entry['record'])
+            elif entry['op'] == 'update':
+                model.update_row(entry['index'], entry['record'])
+            elif entry['op'] == 'delete':
+                model.delete_row(entry['index'])
+        model.reset_changes()
+        return len(entries)
+
+    def signature(self):
+        """Размер и время изменения журнала (для ключа кэша) или None, если его нет"""
+        if not self.exists():
+            return None
+        stat = os.stat(self.path)
+        return stat.st_size, stat.st_mtime_ns
+
+    def apply(self, df: pd.DataFrame, columns=None) -> pd.DataFrame:
+        """Применяет операции журнала к DataFrame, прочитанному из файла данных.
+
+        columns — все столбцы файла в порядке значений записей журнала,
+        если df содержит только часть из них.
+        """
+        columns = list(df.columns) if columns is None else list(columns)
+        positions = [columns.index(col) for col in df.columns]
+        df = df.reset_index(drop=True)
+        added = []
+        for entry in self.read():
+            if entry['op'] == 'add':
+                added.append([entry['record'][i] for i in positions])
+                continue
+            if added:
+                # Подряд идущие добавления склеиваем одним concat
+                df = pd.concat([df, pd.DataFrame(added, columns=df.columns)], ignore_index=True)
+                added = []
+            if entry['op'] == 'update' and 0 <= entry['index'] < len(df):
+                df.iloc[entry['index']] = [entry['record'][i] for i in positions]
+            elif entry['op'] == 'delete' and 0 <= entry['index'] < len(df):
+                df = df.drop(entry['index']).reset_index(drop=True)
+        if added:
+            df = pd.concat([df, pd.DataFrame(added, columns=df.columns)], ignore_index=True)
+        return df
+
+    def clear(self):
+        """Удаляет журнал после объединения с основным файлом"""
+        if os.path.exists(self.path):
+            os.remove(self.path)
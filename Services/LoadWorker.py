@@ -0,0 +1,160 @@
+from PySide6.QtCore import Qt, QObject, QRunnable, QThreadPool, Signal
+from PySide6.QtWidgets import QMessageBox, QProgressDialog
+
+
+class LoadCancelled(Exception):
+    """Загрузка прервана пользователем"""
+
+
+class LoadSignals(QObject):
+    progress = Signal(int, str)
+    finished = Signal(object)
+    error = Signal(str)
+    cancelled = Signal()
+
+
+class LoadWorker(QRunnable):
+    """Выполняет функцию загрузки в пуле потоков Qt.
+
+    Функция получает именованный аргумент progress_callback(percent, message);
+    если пользователь нажал «Отмена», очередной вызов прерывает загрузку.
+    """
+    def __init__(self, load_func, *args, **kwargs):
+        super().__init__()
+        self.load_func = load_func
+        self.args = args
+        self.kwargs = kwargs
+        self.signals = LoadSignals()
+        self._cancelled = False
+
+    def cancel(self):
+        self._cancelled = True
+
+    def is_cancelled(self):
+        return self._cancelled
+
+    def report_progress(self, percent, message=""):
+        if self._cancelled:
+            raise LoadCancelled()
+        self.signals.progress.emit(int(percent), message)
+
+    def run(self):
+        try:
+            result = self.load_func(*self.args, progress_callback=self.report_progress, **self.kwargs)
+        except LoadCancelled:
+            self.signals.cancelled.emit()
+            return
+        except Exception as e:
+            self.signals.error.emit(str(e))
+            return
+
+        if self._cancelled:
+            self.signals.cancelled.emit()
+        else:
+            self.signals.finished.emit(result)
+
+
+class BackgroundLoader:
+    """Запуск LoadWorker с окном прогресса и кнопкой отмены.
+
+    Отмена срабатывает при очередном сообщении о прогрессе: разбор Excel
+    (read_excel) прервать нельзя, поток доработает до конца разбора.
+    Пока прерванная загрузка не завершилась, новая ждет в очереди, чтобы
+    два потока не писали одновременно в кэш и настройки движков чтения.
+    """
+    def __init__(self, parent_ui=None):
+        self.parent_ui = parent_ui
+        self.worker = None
+        self.dialog = None
+        self.stopping = None  # Отмененная загрузка, поток которой еще работает
+        self._queued = None  # Загрузка, ожидающая завершения отмененной
+        self._title = ""
+
+    def start(self, load_func, *args, on_finished, on_error=None, title="Загрузка данных...", **kwargs):
+        self.cancel()
+
+        self.dialog = QProgressDialog(title, "Отмена", 0, 100, self.parent_ui)
+        self.dialog.setWindowTitle("Загрузка")
+        self.dialog.setWindowModality(Qt.WindowModality.WindowModal)
+        self.dialog.setMinimumDuration(300)
+        self.dialog.setAutoClose(False)
+        self.dialog.setAutoReset(False)
+        self.dialog.setValue(0)
+        self._title = title
+
+        worker = LoadWorker(load_func, *args, **kwargs)
+        worker.signals.progress.connect(lambda percent, message: self._on_progress(worker, percent, message))
+        worker.signals.finished.connect(lambda result: self._on_finished(worker, result, on_finished))
+        worker.signals.error.connect(lambda message: self._on_error(worker, message, on_error))
+        worker.signals.cancelled.connect(lambda: self._on_cancelled(worker))
+        self.dialog.canceled.connect(self.cancel)
+
+        self.worker = worker
+        if self.stopping is not None:
+            self.dialog.setLabelText("Ожидание завершения прерванной загрузки...")
+            self._queued = worker
+        else:
+            QThreadPool.globalInstance().start(worker)
+
+    def cancel(self):
+        """Отмена текущей загрузки; результат прерванной загрузки отбрасывается"""
+        if self.worker is not None:
+            self.worker.cancel()
+            if self._queued is self.worker:
+                self._queued = None  # Еще не запущена
+            else:
+                self.stopping = self.worker
+            self.worker = None
+        self._close_dialog()
+
+    def is_running(self):
+        return self.worker is not None
+
+    def _on_progress(self, worker, percent, message):
+        if worker is self.worker and self.dialog is not None:
+            self.dialog.setValue(percent)
+            if message:
+                self.dialog.setLabelText(message)
+
+    def _on_finished(self, worker, result, on_finished):
+        self._release(worker)
+        if worker is not self.worker:
+            return
+        self.worker = None
+        self._close_dialog()
+        on_finished(result)
+
+    def _on_error(self, worker, message, on_error):
+        self._release(worker)
+        if worker is not self.worker:
+            return
+        self.worker = None
+        self._close_dialog()
+        if on_error is not None:
+            on_error(message)
+        else:
+            QMessageBox.critical(self.parent_ui, "Ошибка", f"Ошибка загрузки файла:\n{message}")
+
+    def _on_cancelled(self, worker):
+        self._release(worker)
+        if worker is self.worker:
+            self.worker = None
+            self._close_dialog()
+
+    def _release(self, worker):
+        # Поток отмененной загрузки завершился: можно запускать ожидающую
+        if worker is not self.stopping:
+            return
+        self.stopping = None
+        if self._queued is not None:
+            queued, self._queued = self._queued, None
+            if self.dialog is not None:
+                self.dialog.setLabelText(self._title)
+            QThreadPool.globalInstance().start(queued)
+
+    def _close_dialog(self):
+        if self.dialog is not None:
+            self.dialog.canceled.disconnect()
+            self.dialog.close()
+            self.dialog = None
+
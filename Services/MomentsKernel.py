@@ -0,0 +1,128 @@
+import numpy as np
+
+# Порция строк, которую ядро обрабатывает за раз: временные массивы
+# порции (35 столбцов × 1024 строки) помещаются в кэш процессора
+BLOCK_ROWS = 1024
+# Целочисленные столбцы с таким размахом значений считаются подсчетом (bincount)
+COUNTING_SPAN = 1 << 16
+
+
+def fused_moments(chunks, n_cols):
+    """Количество, сумма, среднее, ст. отклонение, минимум, максимум,
+    асимметрия и эксцесс всех столбцов за один проход по порциям строк.
+
+    chunks — двумерные массивы float64 (строки × столбцы), пропуски — NaN.
+    Каждая порция обходится блоками по BLOCK_ROWS строк в заранее выделенных
+    буферах. Степенные суммы копятся относительно среднего первого блока,
+    чтобы не терять точность на столбцах с большим средним.
+    """
+    count = np.zeros(n_cols)
+    s1, s2, s3, s4 = (np.zeros(n_cols) for _ in range(4))
+    col_min = np.full(n_cols, np.inf)
+    col_max = np.full(n_cols, -np.inf)
+    shift = None
+    d = p = None
+
+    for chunk in chunks:
+        for start in range(0, len(chunk), BLOCK_ROWS):
+            block = chunk[start:start + BLOCK_ROWS]
+            nan = np.isnan(block)
+            missing = nan.sum(axis=0)
+            if shift is None:
+                shift = np.where(nan, 0.0, block).sum(axis=0) / np.maximum(len(block) - missing, 1)
+            if d is None or d.shape != block.shape:
+                d = np.empty_like(block)
+                p = np.empty_like(block)
+            np.subtract(block, shift, out=d)
+            if missing.any():
+                np.copyto(d, 0.0, where=nan)
+            count += len(block) - missing
+            s1 += d.sum(axis=0)
+            np.multiply(d, d, out=p)
+            s2 += p.sum(axis=0)
+            p *= d
+            s3 += p.sum(axis=0)
+            p *= d
+            s4 += p.sum(axis=0)
+            np.minimum(col_min, np.fmin.reduce(block, axis=0, initial=np.inf), out=col_min)
+            np.maximum(col_max, np.fmax.reduce(block, axis=0, initial=-np.inf), out=col_max)
+
+    if shift is None:
+        shift = np.zeros(n_cols)
+    return moments_from_sums(count, s1, s2, s3, s4, shift, col_min, col_max)
+
+
+def moments_from_sums(count, s1, s2, s3, s4, shift, col_min, col_max):
+    """Переводит степенные суммы в статистики с поправками, как в pandas"""
+    with np.errstate(divide='ignore', invalid='ignore'):
+        n = count
+        mean_d = s1 / n
+        m2 = s2 / n - mean_d ** 2
+        m3 = s3 / n - 3 * mean_d * s2 / n + 2 * mean_d ** 3
+        m4 = s4 / n - 4 * mean_d * s3 / n + 6 * mean_d ** 2 * s2 / n - 3 * mean_d ** 4
+        m2 = np.where(np.abs(m2) < 1e-14, 0.0, m2)
+
+        var = m2 * n / (n - 1)
+        skew = np.sqrt(n * (n - 1)) / (n - 2) * m3 / m2 ** 1.5
+        kurt = ((n + 1) * m4 / m2 ** 2 - 3 * (n - 1)) * (n - 1) / ((n - 2) * (n - 3))
+
+    skew = np.where(m2 == 0, 0.0, skew)
+    kurt = np.where(m2 == 0, 0.0, kurt)
+    return {
+        'count': count,
+        'sum': shift * count + s1,
+        'mean': np.where(n > 0, shift + mean_d, np.nan),
+        'std': np.where(n > 1, np.sqrt(np.maximum(var, 0)), np.nan),
+        'min': np.where(n > 0, col_min, np.nan),
+        'max': np.where(n > 0, col_max, np.nan),
+        'skew': np.where(n > 2, skew, np.nan),
+        'kurt': np.where(n > 3, kurt, np.nan),
+    }
+
+
+def order_statistics(values: np.ndarray, qs, moments):
+    """Квантили (линейная интерполяция, как в pandas) и мода каждого столбца.
+
+    Для столбца выполняется один шаг упорядочивания, общий для всех квантилей
+    и моды: целочисленные столбцы с небольшим размахом (бинарные признаки,
+    баллы) раскладываются подсчетом np.bincount, остальные сортируются один раз.
+    moments — результат fused_moments по тем же values (нужны count, min, max).
+    Возвращает массив квантилей (len(qs), число столбцов) и массив мод.
+    """
+    n_cols = values.shape[1]
+    quantiles = np.full((len(qs), n_cols), np.nan)
+    modes = np.full(n_cols, np.nan)
+    for j in range(n_cols):
+        n = int(moments['count'][j])
+        if n == 0:
+            continue
+        column = values[:, j]
+        if n < len(column):
+            column = column[~np.isnan(column)]
+        low_value = moments['min'][j]
+        span = moments['max'][j] - low_value
+
+        positions = np.asarray(qs, dtype=np.float64) * (n - 1)
+        low = np.floor(positions).astype(np.int64)
+        high = np.minimum(low + 1, n - 1)
+        integers = None
+        if span < COUNTING_SPAN:
+            with np.errstate(invalid='ignore'):
+                integers = column.astype(np.intp)
+        if integers is not None and np.array_equal(integers, column):
+            integers -= int(low_value)
+            counts = np.bincount(integers, minlength=int(span) + 1)
+            modes[j] = low_value + np.argmax(counts)
+            cumulative = np.cumsum(counts)
+            a = low_value + np.searchsorted(cumulative, low, side='right')
+            b = low_value + np.searchsorted(cumulative, high, side='right')
+        else:
+            ordered = np.sort(column)
+            starts = np.flatnonzero(np.r_[True, ordered[1:] != ordered[:-1]])
+            modes[j] = ordered[starts[np.argmax(np.diff(np.r_[starts, n]))]]
+            a = ordered[low]
+            b = ordered[high]
+        # Та же формула, что у numpy (_lerp), чтобы совпадать с pandas до последнего знака
+        t = positions - low
+        quantiles[:, j] = np.where(t >= 0.5, b - (b - a) * (1 - t), a + (b - a) * t)
+    return quantiles, modes
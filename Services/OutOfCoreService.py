@@ -0,0 +1,316 @@
+import os
+import copy
+import json
+import shutil
+import tempfile
+import numpy as np
+import pandas as pd
+from openpyxl import load_workbook
+from Services.CacheService import get_cache_dir
+from Services.DatasetLoader import DatasetLoader
+from Services.MomentsKernel import fused_moments
+
+CHUNK_ROWS = 65536
+SAMPLE_ROWS = 100000
+COPY_BLOCK = 1024 * 1024
+
+
+def get_memmap_dir():
+    """Возвращает путь к папке файлов-матриц внутри папки кэша"""
+    return os.path.join(get_cache_dir(), "memmap")
+
+
+class MemmapMatrix:
+    """Числовые столбцы набора данных в файле, отображенном в память.
+
+    Матрица float64 хранится по столбцам (order='F'), поэтому каждый столбец
+    непрерывен на диске. Все вычисления идут порциями по CHUNK_ROWS строк или
+    по одному столбцу, так что в памяти никогда не находится весь набор.
+
+    select() дает ту же матрицу, ограниченную строками фильтра: порции
+    и столбцы читаются с диска только в этих строках.
+    """
+    def __init__(self, path, columns, n_rows):
+        self.path = path
+        self.columns = list(columns)
+        self.n_rows = n_rows
+        self.rows = None  # Номера строк файла после фильтра; None — все строки
+        shape = (n_rows, len(self.columns))
+        if n_rows:
+            self.array = np.memmap(path, dtype=np.float64, mode='r', shape=shape, order='F')
+        else:
+            self.array = np.empty(shape, dtype=np.float64)
+
+    def __len__(self):
+        return self.n_rows
+
+    def select(self, rows) -> "MemmapMatrix":
+        """Та же матрица, ограниченная строками rows (номера строк файла по возрастанию)"""
+        selected = copy.copy(self)  # Отображение файла общее, данные не читаются
+        selected.rows = np.asarray(rows) if self.rows is None else self.rows[rows]
+        selected.n_rows = len(selected.rows)
+        return selected
+
+    def frame(self) -> pd.DataFrame:
+        """DataFrame поверх файла без копирования (для таблицы и фильтров)"""
+        if self.rows is not None:
+            return pd.DataFrame(self.array[self.rows], columns=self.columns, index=self.rows)
+        return pd.DataFrame(self.array, columns=self.columns, copy=False)
+
+    def column(self, name) -> np.ndarray:
+        if self.rows is not None:
+            return self.array[self.rows, self.columns.index(name)]
+        return self.array[:, self.columns.index(name)]
+
+    def iter_chunks(self, chunk_rows=CHUNK_ROWS):
+        for start in range(0, self.n_rows, chunk_rows):
+            if self.rows is not None:
+                yield self.array[self.rows[start:start + chunk_rows]]
+            else:
+                yield np.asarray(self.array[start:start + chunk_rows])
+
+    def sample(self, max_rows=SAMPLE_ROWS) -> pd.DataFrame:
+        """Равномерная выборка строк для точечных и линейных графиков"""
+        step = max(1, -(-self.n_rows // max_rows))
+        rows = np.arange(0, self.n_rows, step) if self.rows is None else self.rows[::step]
+        return pd.DataFrame(np.array(self.array[rows]), columns=self.columns, index=rows)
+
+    def moments(self) -> pd.DataFrame:
+        """Количество, сумма, среднее, ст. отклонение, минимум, максимум,
+        асимметрия и эксцесс всех столбцов за один проход по данным"""
+        return pd.DataFrame(fused_moments(self.iter_chunks(), len(self.columns)), index=self.columns)
+
+    def quantiles(self, qs) -> pd.DataFrame:
+        """Квантили (линейная интерполяция, как в pandas) по одному столбцу за раз"""
+        result = {}
+        for j, col in enumerate(self.columns):
+            values = self._valid_values(j)
+            result[col] = np.quantile(values, qs) if len(values) else np.full(len(qs), np.nan)
+        return pd.DataFrame(result, index=qs).T
+
+    def mode(self) -> pd.Series:
+        """Наименьшее из самых частых значений каждого столбца"""
+        result = {}
+        for j, col in enumerate(self.columns):
+            values, counts = np.unique(self._valid_values(j), return_counts=True)
+            result[col] = values[np.argmax(counts)] if len(values) else np.nan
+        return pd.Series(result)
+
+    def missing_counts(self) -> pd.Series:
+        missing = np.zeros(len(self.columns), dtype=np.int64)
+        for chunk in self.iter_chunks():
+            missing += np.isnan(chunk).sum(axis=0)
+        return pd.Series(missing, index=self.columns)
+
+    def count_outside(self, lower, upper) -> pd.Series:
+        """Число значений каждого столбца вне границ [lower, upper]"""
+        lower = np.asarray(lower, dtype=np.float64)
+        upper = np.asarray(upper, dtype=np.float64)
+        counts = np.zeros(len(self.columns), dtype=np.int64)
+        for chunk in self.iter_chunks():
+            counts += ((chunk < lower) | (chunk > upper)).sum(axis=0)
+        return pd.Series(counts, index=self.columns)
+
+    def corr(self, columns=None) -> pd.DataFrame:
+        """Корреляция Пирсона по парно-полным строкам, как DataFrame.corr"""
+        columns = list(self.columns if columns is None else columns)
+        idx = [self.columns.index(col) for col in columns]
+        k = len(idx)
+        n = np.zeros((k, k))
+        sx = np.zeros((k, k))
+        sxx = np.zeros((k, k))
+        sxy = np.zeros((k, k))
+        shift = None
+        for chunk in self.iter_chunks():
+            chunk = chunk[:, idx]
+            valid = ~np.isnan(chunk)
+            mask = valid.astype(np.float64)
+            if shift is None:
+                shift = np.where(valid, chunk, 0.0).sum(axis=0) / np.maximum(valid.sum(axis=0), 1)
+            d = np.where(valid, chunk - shift, 0.0)
+            n += mask.T @ mask
+            sx += d.T @ mask      # sx[i, j] — сумма x_i по строкам, где есть и x_j
+            sxx += (d * d).T @ mask
+            sxy += d.T @ d
+
+        with np.errstate(divide='ignore', invalid='ignore'):
+            cov = n * sxy - sx * sx.T
+            var_x = n * sxx - sx * sx
+            corr = cov / np.sqrt(var_x * var_x.T)
+        corr = np.clip(corr, -1.0, 1.0)
+        np.fill_diagonal(corr, np.where(np.diag(var_x) > 0, 1.0, np.nan))
+        return pd.DataFrame(corr, index=columns, columns=columns)
+
+    def histogram(self, name, bins=10):
+        """Гистограмма столбца, накопленная по порциям"""
+        column = self.column(name)
+        valid_min, valid_max = np.inf, -np.inf
+        for start in range(0, self.n_rows, CHUNK_ROWS):
+            part = column[start:start + CHUNK_ROWS]
+            part = part[~np.isnan(part)]
+            if len(part):
+                valid_min, valid_max = min(valid_min, part.min()), max(valid_max, part.max())
+        if not np.isfinite(valid_min):
+            return np.zeros(bins, dtype=np.int64), np.linspace(0, 1, bins + 1)
+
+        counts = np.zeros(bins, dtype=np.int64)
+        edges = np.histogram_bin_edges([valid_min, valid_max], bins=bins)
+        for start in range(0, self.n_rows, CHUNK_ROWS):
+            part = column[start:start + CHUNK_ROWS]
+            counts += np.histogram(part[~np.isnan(part)], bins=edges)[0]
+        return counts, edges
+
+    def value_counts(self, name) -> pd.Series:
+        values, counts = np.unique(self._valid_values(self.columns.index(name)), return_counts=True)
+        return pd.Series(counts, index=values)
+
+    def _valid_values(self, j):
+        values = np.asarray(self.column(self.columns[j]))
+        return values[~np.isnan(values)]
+
+
+class OutOfCoreService:
+    """Однократное преобразование файла в MemmapMatrix с повторным использованием.
+
+    Файл читается потоково (CSV — порциями pandas, xlsx — построчно в режиме
+    read_only openpyxl); каждый числовой столбец дописывается в свой временный
+    файл, затем столбцы склеиваются в одну матрицу. Повторное открытие того же
+    неизмененного файла сразу возвращает готовую матрицу.
+    """
+    META_SUFFIX = ".json"
+    DATA_SUFFIX = ".f64"
+
+    def __init__(self, cache_service, memmap_dir=None):
+        self.cache_service = cache_service
+        self.memmap_dir = memmap_dir or get_memmap_dir()
+        os.makedirs(self.memmap_dir, exist_ok=True)
+
+    def open(self, file_path, progress_callback=None) -> MemmapMatrix:
+        progress = progress_callback or (lambda percent, message="": None)
+        progress(0, "Проверка файла...")
+        key = self.cache_service.make_key(file_path, "memmap")
+        meta_path = os.path.join(self.memmap_dir, key + self.META_SUFFIX)
+        data_path = os.path.join(self.memmap_dir, key + self.DATA_SUFFIX)
+
+        meta = self._read_meta(meta_path)
+        if meta is None or not os.path.exists(data_path):
+            self._remove_old(os.path.abspath(file_path))
+            meta = self._convert(file_path, data_path, progress)
+            meta['source'] = os.path.abspath(file_path)
+            tmp_path = meta_path + ".tmp"
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(meta, f, ensure_ascii=False)
+            os.replace(tmp_path, meta_path)
+
+        if not meta['columns']:
+            raise ValueError("В файле нет числовых столбцов")
+        progress(100, "Готово")
+        return MemmapMatrix(data_path, meta['columns'], meta['n_rows'])
+
+    def _convert(self, file_path, data_path, progress):
+        work_dir = tempfile.mkdtemp(dir=self.memmap_dir)
+        try:
+            columns = None
+            handles = []
+            n_rows = 0
+            for chunk, percent in self._iter_source_chunks(file_path):
+                if columns is None:
+                    columns = [col for col in chunk.columns if self._is_numeric(chunk[col])]
+                    handles = [open(os.path.join(work_dir, f"{i}.bin"), 'wb') for i in range(len(columns))]
+                for handle, col in zip(handles, columns):
+                    values = pd.to_numeric(chunk[col], errors='coerce').to_numpy(dtype=np.float64, na_value=np.nan)
+                    handle.write(values.tobytes())
+                n_rows += len(chunk)
+                progress(percent, f"Преобразование файла... строк: {n_rows}")
+
+            for handle in handles:
+                handle.close()
+
+            # Склеиваем столбцы: матрица order='F' — это столбцы подряд
+            progress(92, "Запись матрицы...")
+            tmp_path = data_path + ".tmp"
+            with open(tmp_path, 'wb') as out:
+                for i in range(len(columns or [])):
+                    with open(os.path.join(work_dir, f"{i}.bin"), 'rb') as part:
+                        shutil.copyfileobj(part, out, COPY_BLOCK)
+            os.replace(tmp_path, data_path)
+            return {'columns': [str(col) for col in columns or []], 'n_rows': n_rows}
+        finally:
+            for handle in handles:
+                handle.close()
+            shutil.rmtree(work_dir, ignore_errors=True)
+
+    def _iter_source_chunks(self, file_path):
+        """Порции исходного файла в виде (DataFrame, процент выполнения)"""
+        file_format = DatasetLoader.sniff_format(file_path)
+        if file_format == 'csv':
+            total_size = os.path.getsize(file_path)
+            with open(file_path, 'rb') as f:
+                for chunk in pd.read_csv(f, encoding='utf-8-sig', chunksize=CHUNK_ROWS):
+                    yield chunk, 90 * min(f.tell() / total_size, 1.0)
+        elif file_format == 'xlsx':
+            yield from self._iter_xlsx_chunks(file_path)
+        else:
+            # xls и SQLite потоково не читаются: разбираем целиком и режем на порции
+            data = DatasetLoader(replay_journal=False).load(file_path)
+            for start in range(0, len(data), CHUNK_ROWS):
+                yield data.iloc[start:start + CHUNK_ROWS], 90 * min((start + CHUNK_ROWS) / len(data), 1.0)
+
+    def _iter_xlsx_chunks(self, file_path):
+        wb = load_workbook(file_path, read_only=True, data_only=True)
+        try:
+            ws = wb.worksheets[0]
+            rows = ws.iter_rows(values_only=True)
+            header = next(rows, None)
+            if header is None:
+                return
+            header = [f"Unnamed: {i}" if name is None else name for i, name in enumerate(header)]
+            total = ws.max_row or 0
+            batch = []
+            done = 0
+            for row in rows:
+                if all(value is None for value in row):
+                    continue
+                batch.append(row[:len(header)])
+                if len(batch) == CHUNK_ROWS:
+                    done += len(batch)
+                    yield pd.DataFrame(batch, columns=header), 90 * min(done / max(total, 1), 1.0)
+                    batch = []
+            if batch:
+                yield pd.DataFrame(batch, columns=header), 90
+        finally:
+            wb.close()
+
+    @staticmethod
+    def _is_numeric(series):
+        if pd.api.types.is_numeric_dtype(series):
+            return True
+        try:
+            pd.to_numeric(series)
+            return series.notna().any()
+        except (ValueError, TypeError):
+            return False
+
+    def _read_meta(self, meta_path):
+        if not os.path.exists(meta_path):
+            return None
+        try:
+            with open(meta_path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def _remove_old(self, source):
+        # Матрицы прошлых версий того же файла больше не понадобятся
+        for name in os.listdir(self.memmap_dir):
+            if not name.endswith(self.META_SUFFIX):
+                continue
+            meta_path = os.path.join(self.memmap_dir, name)
+            meta = self._read_meta(meta_path)
+            if meta is not None and meta.get('source') == source:
+                data_path = meta_path[:-len(self.META_SUFFIX)] + self.DATA_SUFFIX
+                for path in (meta_path, data_path):
+                    try:
+                        os.remove(path)
+                    except OSError:
+                        pass
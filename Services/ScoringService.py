@@ -0,0 +1,95 @@
+import numpy as np
+import pandas as pd
+from EditingMode.OsteoartritModel import BINARY_COLUMNS, resolve_columns
+
+# Баллы бинарных признаков для расчета суммы (ключи — столбцы модели)
+FEATURE_WEIGHTS = {
+    "ИМТ<25": 1,
+    "ГМС: легк.степ.": 2,
+    "ГМС: тяж.степ.": 3,
+    "Кожа: легк.степ.": 2,
+    "Кожа: тяж.степ.": 2,
+    "Келоидные рубцы": 2,
+    "Стрии": 2,
+    "Геморрагии": 2,
+    "Грыжи": 3,
+    "Птозы": 3,
+    "Хруст ВЧС": 2,
+    "Парадонтоз": 1,
+    "Долихостеномелия": 3,
+    "Кифоз/Лордоз": 2,
+    "Деф.гр.клетки": 3,
+    "Плоскостопие": 2,
+    "Вальгус стоп": 1,
+    "Хруст суставов": 1,
+    "ПМК": 2,
+    "Варикоз: легк.степ.": 2,
+    "Варикоз: тяж.степ.": 3,
+    "Миопия: легк.степ.": 1,
+    "Миопия: тяж.степ.": 2,
+    "Желч. пузырь": 2,
+    "ГЭРБ": 2,
+    "Гипотензия": 1,
+}
+
+# Порог суммы баллов, начиная с которого ставится ДСТ
+DST_THRESHOLD = 8
+
+
+class ScoringService:
+    """Векторный расчет суммы баллов и ДСТ по упакованной матрице симптомов.
+
+    Бинарные признаки пациента упаковываются в битовую маску uint32
+    (бит i — признак BINARY_COLUMNS[i]). Сумма баллов — скалярное
+    произведение битов маски на веса; оно считается сразу для всего набора
+    через таблицы сумм весов по каждому из четырех байтов маски.
+    """
+    def __init__(self, weights=None, threshold=DST_THRESHOLD):
+        weights = weights or FEATURE_WEIGHTS
+        self.columns = list(BINARY_COLUMNS)
+        self.weights = np.array([weights.get(col, 0) for col in self.columns], dtype=np.int16)
+        self.threshold = threshold
+        self._byte_tables = self._build_byte_tables()
+
+    def pack(self, features) -> np.ndarray:
+        """Упаковывает матрицу признаков (n x 26) из 0/1 в маски uint32"""
+        features = np.asarray(features)
+        if features.ndim == 1:
+            features = features[np.newaxis, :]
+        bit_values = np.left_shift(np.int64(1), np.arange(len(self.columns), dtype=np.int64))
+        return ((features != 0).astype(np.int64) @ bit_values).astype(np.uint32)
+
+    def pack_frame(self, df: pd.DataFrame) -> np.ndarray:
+        """Упаковывает бинарные столбцы DataFrame в маски uint32"""
+        columns = resolve_columns(df, self.columns)
+        features = df[columns].fillna(0).to_numpy(dtype=np.int8)
+        return self.pack(features)
+
+    def score_masks(self, masks) -> np.ndarray:
+        """Сумма баллов для каждой маски"""
+        masks = np.asarray(masks, dtype=np.uint32)
+        scores = np.zeros(masks.shape, dtype=np.int16)
+        for byte_index, table in enumerate(self._byte_tables):
+            scores += table[(masks >> np.uint32(8 * byte_index)) & np.uint32(0xFF)]
+        return scores
+
+    def classify(self, scores) -> np.ndarray:
+        """Признак ДСТ (1/0) по сумме баллов"""
+        return (np.asarray(scores) >= self.threshold).astype(np.int8)
+
+    def score_frame(self, df: pd.DataFrame):
+        """Сумма баллов и ДСТ для всех строк DataFrame одним векторным вызовом"""
+        scores = self.score_masks(self.pack_frame(df))
+        return scores, self.classify(scores)
+
+    def _build_byte_tables(self):
+        # Для каждого байта маски: сумма весов всех 256 комбинаций его битов
+        byte_values = np.arange(256, dtype=np.uint32)
+        bits = (byte_values[:, np.newaxis] >> np.arange(8, dtype=np.uint32)) & 1
+        tables = []
+        for byte_index in range(4):
+            byte_weights = np.zeros(8, dtype=np.int16)
+            chunk = self.weights[8 * byte_index: 8 * byte_index + 8]
+            byte_weights[:len(chunk)] = chunk
+            tables.append((bits.astype(np.int16) @ byte_weights).astype(np.int16))
+        return tables
@@ -0,0 +1,73 @@
+import numbers
+import numpy as np
+import pandas as pd
+
+
+class SortedIndex:
+    """Отсортированные индексы числовых столбцов для условий на диапазон.
+
+    Индекс столбца (устойчивый argsort и отсортированные значения без
+    пропусков) строится при первом запросе к столбцу и переиспользуется,
+    пока не загружен новый набор данных. Границы условия «>, >=, <, <=, ==»
+    или BETWEEN находятся двумя двоичными поисками за O(log n) вместо
+    сравнения всего столбца. Сама маска — массив из n байт: его заполнение
+    остается O(n), но это одна запись в память без сравнений и пропусков;
+    отмечается меньшая из частей (k попавших строк или n - k остальных).
+    """
+    def __init__(self, df: pd.DataFrame):
+        self.df = df
+        self._indexes = {}
+        self._nulls = {}
+
+    def supports(self, column, value):
+        if column not in self.df.columns or isinstance(value, bool):
+            return False
+        dtype = self.df[column].dtype
+        return (isinstance(value, numbers.Real) and pd.api.types.is_numeric_dtype(dtype)
+                and not pd.api.types.is_bool_dtype(dtype))
+
+    def mask(self, column, low=None, high=None, low_inclusive=True, high_inclusive=True) -> np.ndarray:
+        """Булева маска строк с значением в диапазоне; пропуски в нее не входят"""
+        order, values = self._get(column)
+        start, stop = self._bounds(values, low, high, low_inclusive, high_inclusive)
+        if stop - start <= len(self.df) // 2:
+            result = np.zeros(len(self.df), dtype=bool)
+            result[order[start:stop]] = True
+        else:
+            # Диапазон покрывает большую часть строк: дешевле снять отметки с остальных
+            result = np.ones(len(self.df), dtype=bool)
+            result[order[:start]] = False
+            result[order[stop:]] = False
+            result[self._nulls[column]] = False
+        return result
+
+    def compare_mask(self, column, operator, value):
+        """Маска для сравнения '>', '>=', '<', '<=', '==' или None для других операторов"""
+        if operator in ('==', '='):
+            return self.mask(column, value, value)
+        if operator == '>':
+            return self.mask(column, low=value, low_inclusive=False)
+        if operator == '>=':
+            return self.mask(column, low=value)
+        if operator == '<':
+            return self.mask(column, high=value, high_inclusive=False)
+        if operator == '<=':
+            return self.mask(column, high=value)
+        return None
+
+    @staticmethod
+    def _bounds(values, low, high, low_inclusive, high_inclusive):
+        start = 0 if low is None else np.searchsorted(values, low, side='left' if low_inclusive else 'right')
+        stop = len(values) if high is None else np.searchsorted(values, high, side='right' if high_inclusive else 'left')
+        return int(start), int(max(start, stop))
+
+    def _get(self, column):
+        index = self._indexes.get(column)
+        if index is None:
+            values = self.df[column].to_numpy(dtype=np.float64, na_value=np.nan)
+            order = np.argsort(values, kind='stable')  # Пропуски (NaN) оказываются в конце
+            valid = len(values) - int(np.count_nonzero(np.isnan(values)))
+            index = (order[:valid], values[order[:valid]])
+            self._indexes[column] = index
+            self._nulls[column] = order[valid:]
+        return index
@@ -0,0 +1,127 @@
+import os
+import json
+import time
+import tempfile
+import importlib.util
+import pandas as pd
+from Services.CacheService import get_app_dir
+
+# Движки pandas.read_excel: модуль, который должен быть установлен, и поддерживаемые форматы
+ENGINES = {
+    'calamine': ('python_calamine', ('xlsx', 'xls')),
+    'openpyxl': ('openpyxl', ('xlsx',)),
+    'xlrd': ('xlrd', ('xls',)),
+}
+# Движок по умолчанию, если сравнить не с чем
+DEFAULT_ENGINES = {'xlsx': 'openpyxl', 'xls': 'xlrd'}
+
+BENCHMARK_ROWS = 200
+# Замеры на движок после прогревочного чтения; берется лучший
+BENCHMARK_RUNS = 2
+# Границы классов размера файла (байт): выбор движка запоминается для каждого класса
+SIZE_CLASSES = (1 << 20, 16 << 20, 128 << 20)
+SETTINGS_FILE = "reader_engines.json"
+
+
+def get_available_engines(file_format):
+    """Установленные движки, умеющие читать формат"""
+    return [name for name, (module, formats) in ENGINES.items()
+            if file_format in formats and importlib.util.find_spec(module) is not None]
+
+
+class SpreadsheetReader:
+    """Чтение Excel самым быстрым из установленных движков pandas.
+
+    Для каждого формата и класса размера файла движки один раз сравниваются
+    на первых BENCHMARK_ROWS строках читаемого файла, победитель запоминается
+    в reader_engines.json рядом с программой. Если установлен только один
+    движок (обычно openpyxl), сравнение не проводится.
+    """
+    def __init__(self, settings_path=None):
+        self.settings_path = settings_path or os.path.join(get_app_dir(), SETTINGS_FILE)
+        self._choices = self._load_choices()
+
+    def read(self, source, file_format, **kwargs) -> pd.DataFrame:
+        """pd.read_excel с выбранным движком; kwargs передаются как есть"""
+        return pd.read_excel(source, engine=self.choose_engine(source, file_format), **kwargs)
+
+    def choose_engine(self, source, file_format):
+        engines = get_available_engines(file_format)
+        if len(engines) <= 1:
+            return engines[0] if engines else DEFAULT_ENGINES[file_format]
+
+        key = f"{file_format}:{self._size_class(source)}"
+        engine = self._choices.get(key)
+        if engine not in engines:
+            engine = self.benchmark(source, file_format, engines)
+            self._choices[key] = engine
+            self._save_choices()
+        return engine
+
+    @staticmethod
+    def benchmark(source, file_format, engines):
+        """Сравнивает движки на начале файла и возвращает самый быстрый.
+
+        Первое чтение каждым движком не замеряется: оно включает импорт
+        модуля движка. Затем берется лучшее из BENCHMARK_RUNS чтений.
+        """
+        is_path = isinstance(source, (str, os.PathLike))
+        position = None if is_path else source.tell()
+
+        def read_sample(engine):
+            try:
+                pd.read_excel(source, engine=engine, nrows=BENCHMARK_ROWS)
+            finally:
+                if position is not None:
+                    source.seek(position)
+
+        timings = {}
+        for engine in engines:
+            try:
+                read_sample(engine)
+            except Exception:
+                continue  # Движок не справился с файлом — в сравнении не участвует
+            best = float('inf')
+            for _ in range(BENCHMARK_RUNS):
+                start = time.perf_counter()
+                read_sample(engine)
+                best = min(best, time.perf_counter() - start)
+            timings[engine] = best
+        if not timings:
+            return DEFAULT_ENGINES[file_format]
+        return min(timings, key=timings.get)
+
+    @staticmethod
+    def _size_class(source):
+        if isinstance(source, (str, os.PathLike)):
+            size = os.path.getsize(source)
+        else:
+            position = source.tell()
+            size = source.seek(0, os.SEEK_END)
+            source.seek(position)
+        return sum(size >= bound for bound in SIZE_CLASSES)
+
+    def _load_choices(self):
+        try:
+            with open(self.settings_path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def _save_choices(self):
+        # Файл могут одновременно писать процессы загрузки папки, поэтому запись атомарная
+        tmp_path = None
+        try:
+            fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(self.settings_path), suffix=".tmp")
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                json.dump(self._choices, f, ensure_ascii=False, indent=2)
+            os.replace(tmp_path, self.settings_path)
+            tmp_path = None
+        except OSError as e:
+            print(f"Ошибка сохранения выбора движка: {e}")
+        finally:
+            if tmp_path is not None:  # Запись не удалась — временный файл не оставляем
+                try:
+                    os.remove(tmp_path)
+                except OSError:
+                    pass
@@ -0,0 +1,188 @@
+import sqlite3
+from pathlib import Path
+import numpy as np
+import pandas as pd
+from EditingMode.OsteoartritModel import COLUMN_DTYPES, apply_schema, exact_floats, resolve_columns
+
+TABLE_NAME = "records"
+INDEXED_COLUMNS = ["Врач", "ДСТ", "Возраст"]
+INSERT_CHUNK_ROWS = 5000
+
+SQLITE_SIGNATURE = b'SQLite format 3\x00'
+
+
+def _quote(name):
+    return '"' + str(name).replace('"', '""') + '"'
+
+
+def _sql_type(dtype):
+    if pd.api.types.is_integer_dtype(dtype) or pd.api.types.is_bool_dtype(dtype):
+        return "INTEGER"
+    if pd.api.types.is_float_dtype(dtype):
+        return "REAL"
+    return ""  # Без объявленного типа: смешанные значения хранятся как есть
+
+
+def _to_rows(df):
+    # numpy-типы и пропуски переводим в значения, которые понимает sqlite3,
+    # float32 — по десятичной записи, чтобы в REAL попало 170.3, а не 170.3000030517578
+    df = exact_floats(df)
+    return df.astype(object).where(df.notna(), None).itertuples(index=False, name=None)
+
+
+class SqliteStorage:
+    """Хранение записей регистра во встроенной базе SQLite.
+
+    Каждая запись — строка таблицы records с rowid, поэтому добавление,
+    изменение и удаление одной записи в базе выполняются по B-дереву
+    за O(log n) без перестроения всей таблицы. Порядковый номер строки
+    в интерфейсе переводится в rowid по списку идентификаторов в памяти
+    (загружается при первом обращении к строкам): удаление сдвигает этот
+    список, то есть стоит O(n). Страницы для таблицы читаются диапазонами
+    rowid. По Врач, ДСТ и Возраст строятся индексы.
+
+    read_only=True открывает файл только для чтения (предпросмотр и анализ):
+    без PRAGMA и создания таблиц, файл не изменяется.
+    """
+    def __init__(self, db_path, read_only=False):
+        self.db_path = db_path
+        self.read_only = read_only
+        self._row_ids = None
+        if read_only:
+            self.conn = sqlite3.connect(f"{Path(db_path).resolve().as_uri()}?mode=ro", uri=True)
+            if not self._table_exists():
+                self.conn.close()
+                raise ValueError(f"В базе данных нет таблицы {TABLE_NAME}: это не файл регистра")
+        else:
+            self.conn = sqlite3.connect(db_path)
+            self.conn.execute("PRAGMA journal_mode=WAL")
+            self.conn.execute("PRAGMA synchronous=NORMAL")
+            if not self._table_exists():
+                self._create_table(pd.DataFrame({col: pd.Series(dtype=dtype) for col, dtype in COLUMN_DTYPES.items()}))
+        self.columns = self._read_columns()
+
+    @staticmethod
+    def write_frame(df: pd.DataFrame, db_path, progress_callback=None):
+        """Создает (перезаписывает) базу из DataFrame; удобно для фонового потока"""
+        storage = SqliteStorage(db_path)
+        try:
+            storage.import_frame(df, progress_callback)
+        finally:
+            storage.close()
+        return db_path
+
+    @staticmethod
+    def is_sqlite_file(file_path):
+        with open(file_path, 'rb') as f:
+            return f.read(len(SQLITE_SIGNATURE)) == SQLITE_SIGNATURE
+
+    @property
+    def row_ids(self):
+        if self._row_ids is None:
+            self._row_ids = [row[0] for row in self.conn.execute(f"SELECT id FROM {TABLE_NAME} ORDER BY id")]
+        return self._row_ids
+
+    def count(self):
+        return len(self.row_ids)
+
+    def import_frame(self, df: pd.DataFrame, progress_callback=None):
+        """Заменяет содержимое базы данными DataFrame (импорт из xlsx/csv)"""
+        progress = progress_callback or (lambda percent, message="": None)
+        with self.conn:
+            self.conn.execute(f"DROP TABLE IF EXISTS {TABLE_NAME}")
+            self._create_table(df)
+            placeholders = ", ".join("?" * len(df.columns))
+            insert_sql = f"INSERT INTO {TABLE_NAME} ({self._column_list(df.columns)}) VALUES ({placeholders})"
+            total = len(df)
+            for start in range(0, total, INSERT_CHUNK_ROWS):
+                chunk = df.iloc[start:start + INSERT_CHUNK_ROWS]
+                self.conn.executemany(insert_sql, _to_rows(chunk))
+                progress(90 * (start + len(chunk)) / max(total, 1), "Запись в базу данных...")
+        self.columns = self._read_columns()
+        self._row_ids = None
+        progress(100, "Готово")
+
+    def read_frame(self, columns=None, nrows=None, fraction=None) -> pd.DataFrame:
+        """Записи в виде DataFrame со схемой типов модели (экспорт).
+
+        columns — только указанные столбцы, nrows — первые записи,
+        fraction — случайная доля записей; отбор выполняет сама SQLite.
+        """
+        columns = self.columns if columns is None else [c for c in self.columns if c in columns]
+        query = f"SELECT {self._column_list(columns)} FROM {TABLE_NAME}"
+        params = []
+        if fraction is not None:
+            # random() возвращает 64-битное целое, сравниваем его долю с порогом
+            query += " WHERE abs(random()) < ?"
+            params.append(int(fraction * 2 ** 63))
+        query += " ORDER BY id"
+        if nrows is not None:
+            query += " LIMIT ?"
+            params.append(int(nrows))
+        df = pd.read_sql_query(query, self.conn, params=params)
+        return apply_schema(df)
+
+    def fetch_rows(self, start, count):
+        """Строки с порядковыми номерами [start, start + count) в виде списка кортежей"""
+        ids = self.row_ids[start:start + count]
+        if not ids:
+            return []
+        return self.conn.execute(
+            f"SELECT {self._column_list(self.columns)} FROM {TABLE_NAME} "
+            f"WHERE id BETWEEN ? AND ? ORDER BY id", (ids[0], ids[-1])).fetchall()
+
+    def read_row(self, index):
+        """Одна запись по порядковому номеру"""
+        row = self.conn.execute(
+            f"SELECT {self._column_list(self.columns)} FROM {TABLE_NAME} WHERE id = ?",
+            (self.row_ids[index],)).fetchone()
+        return pd.Series(row, index=self.columns, dtype=object)
+
+    def insert(self, record):
+        placeholders = ", ".join("?" * len(self.columns))
+        row_ids = self.row_ids  # Список загружается до вставки, иначе новый id попадет в него дважды
+        with self.conn:
+            cursor = self.conn.execute(
+                f"INSERT INTO {TABLE_NAME} ({self._column_list(self.columns)}) VALUES ({placeholders})",
+                self._to_values(record))
+        row_ids.append(cursor.lastrowid)
+
+    def update(self, index, record):
+        assignments = ", ".join(f"{_quote(col)} = ?" for col in self.columns)
+        with self.conn:
+            self.conn.execute(f"UPDATE {TABLE_NAME} SET {assignments} WHERE id = ?",
+                              self._to_values(record) + [self.row_ids[index]])
+
+    def delete(self, index):
+        with self.conn:
+            self.conn.execute(f"DELETE FROM {TABLE_NAME} WHERE id = ?", (self.row_ids[index],))
+        del self.row_ids[index]  # O(n): сдвиг списка идентификаторов
+
+    def close(self):
+        self.conn.close()
+
+    def _to_values(self, record):
+        return [float(str(value)) if isinstance(value, np.float32)
+                else value.item() if hasattr(value, 'item') else value for value in record]
+
+    def _column_list(self, columns):
+        return ", ".join(_quote(col) for col in columns)
+
+    def _table_exists(self):
+        return self.conn.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?", (TABLE_NAME,)).fetchone() is not None
+
+    def _create_table(self, df):
+        definitions = ", ".join(f"{_quote(col)} {_sql_type(df[col].dtype)}".rstrip() for col in df.columns)
+        self.conn.execute(f"CREATE TABLE {TABLE_NAME} (id INTEGER PRIMARY KEY AUTOINCREMENT, {definitions})")
+        for name in INDEXED_COLUMNS:
+            try:
+                col, = resolve_columns(df, [name])
+            except KeyError:
+                continue  # Столбца нет в этом наборе — индекс не нужен
+            index_name = _quote(f"idx_{TABLE_NAME}_{name}")
+            self.conn.execute(f"CREATE INDEX {index_name} ON {TABLE_NAME} ({_quote(col)})")
+
+    def _read_columns(self):
+        info = self.conn.execute(f"PRAGMA table_info({TABLE_NAME})").fetchall()
+        return [row[1] for row in info if row[1] != "id"]
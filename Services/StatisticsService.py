@@ -1,6 +1,11 @@
+import time
 import pandas as pd
 import numpy as np
 from PySide6.QtWidgets import QMessageBox
+from Services.OutOfCoreService import MemmapMatrix
+from Services.MomentsKernel import fused_moments, order_statistics
+
+QUANTILES = [0.25, 0.5, 0.75]
 
 
 class StatisticsService:
@@ -9,41 +14,73 @@ class StatisticsService:
         self.data = data
 
     def get_statistics(self) -> pd.DataFrame:
-        stats_list = []
+        if isinstance(self.data, MemmapMatrix):
+            return self._get_out_of_core_stats()
+
         # Фильтруем только числовые столбцы
         numeric_data = self.data.select_dtypes(include=np.number)
         if numeric_data.empty:
             QMessageBox.critical(self.view, "Ошибка", "Нет числовых данных для статистики!")
+            return pd.DataFrame()
 
-        # Словарь для переименования строк
-        rename_dict = {
-            "count": "Количество",
-            "mean": "Среднее",
-            "std": "Станд. отклонение",
-            "min": "Минимум",
-            "25%": "25-й процентиль",
-            "50%": "Медиана",
-            "75%": "75-й процентиль",
-            "max": "Максимум"
-        }
-        stats_df = numeric_data.describe(include=np.number).round(3)
-        stats_df_renamed = stats_df.rename(index=rename_dict)
+        # Одна матрица float64 с непрерывными столбцами (как у MemmapMatrix):
+        # моменты — за один проход, квантили и мода — одним упорядочиванием столбца
+        values = np.asfortranarray(numeric_data.to_numpy(dtype=np.float64, na_value=np.nan))
+        moments = fused_moments([values], values.shape[1])
+        quantiles, modes = order_statistics(values, QUANTILES, moments)
+        return self._stats_table(moments, dict(zip(QUANTILES, quantiles)), modes,
+                                 len(values), numeric_data.columns)
 
-        # Доп. статистика (мода, skew, kurtosis и т.д.)
-        skew_row = pd.DataFrame(numeric_data.skew().round(3)).T.rename(index={0: "Асимметрия"})
-        kurtosis_row = pd.DataFrame(numeric_data.kurtosis().round(3)).T.rename(index={0: "Эксцесс"})
-        mode_row = pd.DataFrame(numeric_data.mode().iloc[0].round(3)).T.rename(index={0: "Мода"})
-        frequency_row = pd.DataFrame(numeric_data.sum().round(3)).T.rename(index={0: "Частота"})
-        rel_frequency_row = pd.DataFrame((numeric_data.sum() / len(numeric_data) * 100).round(3)).T.rename(
-            index={0: "Отн. частота"})
+    def _get_out_of_core_stats(self) -> pd.DataFrame:
+        """Та же таблица статистики для матрицы на диске, считаемая порциями"""
+        moments = self.data.moments()
+        quantiles = self.data.quantiles(QUANTILES)
+        return self._stats_table(moments, quantiles, self.data.mode(), len(self.data), self.data.columns)
 
-        # Объединяем со stats_df
-        stats_df_extended = pd.concat(
-            [stats_df_renamed, skew_row, kurtosis_row, mode_row, frequency_row, rel_frequency_row])
+    @staticmethod
+    def _stats_table(moments, quantiles, modes, n_rows, columns) -> pd.DataFrame:
+        stats_df = pd.DataFrame({
+            "Количество": moments['count'],
+            "Среднее": moments['mean'],
+            "Станд. отклонение": moments['std'],
+            "Минимум": moments['min'],
+            "25-й процентиль": quantiles[0.25],
+            "Медиана": quantiles[0.5],
+            "75-й процентиль": quantiles[0.75],
+            "Максимум": moments['max'],
+            "Асимметрия": moments['skew'],
+            "Эксцесс": moments['kurt'],
+            "Мода": modes,
+            "Частота": moments['sum'],
+            "Отн. частота": moments['sum'] / n_rows * 100,
+        }, index=columns)
+        return stats_df.round(3)
 
-        return stats_df_extended.transpose()
+    def benchmark(self, repeat=3) -> dict:
+        """Лучшее время (с) прежнего расчета через pandas и однопроходного ядра
+        и наибольшее относительное расхождение их таблиц.
+
+        Ядро суммирует в float64, а pandas складывает столбцы float32 в float32,
+        поэтому на них суммы расходятся в пределах точности float32.
+        """
+        numeric_data = self.data.select_dtypes(include=np.number)
+        timings = {}
+        for name, run in (("pandas", lambda: self._get_numeric_stats(numeric_data)),
+                          ("fused", self.get_statistics)):
+            best = np.inf
+            for _ in range(repeat):
+                start = time.perf_counter()
+                result = run()
+                best = min(best, time.perf_counter() - start)
+            timings[name] = (best, result)
+        old, new = timings["pandas"][1], timings["fused"][1]
+        old = old[new.columns].astype(np.float64)
+        diff = ((old - new).abs() / old.abs().clip(lower=1)).mask(old.isna() != new.isna(), np.inf)
+        diff = diff.max().max()
+        return {"pandas": timings["pandas"][0], "fused": timings["fused"][0], "max_diff": float(diff)}
 
     def _get_numeric_stats(self, numeric_data: pd.DataFrame) -> pd.DataFrame:
+        """Прежний расчет через describe/skew/kurtosis/mode/sum — для сверки и замеров"""
         # Словарь для переименования строк
         rename_dict = {
             "count": "Количество",
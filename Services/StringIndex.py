@@ -0,0 +1,60 @@
+import numpy as np
+import pandas as pd
+
+# С этого числа различных значений поиск подстроки идет через индекс триграмм
+NGRAM_MIN_UNIQUES = 2000
+NGRAM = 3
+
+
+class StringIndex:
+    """Кэш строковых значений столбцов для поиска подстроки («содержит»).
+
+    Для столбца один раз вычисляются коды строк (factorize) и приведенные
+    к нижнему регистру (casefold) строки различных значений; повторный поиск
+    не переводит столбец в строки заново и проверяет только различные
+    значения, а маска строк получается выборкой по кодам. Для столбцов
+    с большим числом различных значений строится индекс триграмм: поиск
+    проверяет только значения, содержащие все триграммы образца.
+    """
+    def __init__(self, df: pd.DataFrame):
+        self.df = df
+        self._columns = {}
+        self._ngrams = {}
+
+    def contains_mask(self, column, text) -> np.ndarray:
+        """Булева маска строк, где значение столбца содержит text без учета регистра"""
+        codes, folded = self._get(column)
+        pattern = str(text).casefold()
+        hits = np.zeros(len(folded) + 1, dtype=bool)  # Последний элемент — для пропусков (код -1)
+        for position in self._candidates(column, folded, pattern):
+            if pattern in folded[position]:
+                hits[position] = True
+        return hits[codes]
+
+    def _get(self, column):
+        cached = self._columns.get(column)
+        if cached is None:
+            codes, uniques = pd.factorize(self.df[column])
+            folded = [str(value).casefold() for value in uniques]
+            cached = (codes, folded)
+            self._columns[column] = cached
+        return cached
+
+    def _candidates(self, column, folded, pattern):
+        if len(folded) < NGRAM_MIN_UNIQUES or len(pattern) < NGRAM:
+            return range(len(folded))
+        postings = self._ngrams.get(column)
+        if postings is None:
+            postings = {}
+            for position, value in enumerate(folded):
+                for start in range(len(value) - NGRAM + 1):
+                    postings.setdefault(value[start:start + NGRAM], set()).add(position)
+            self._ngrams[column] = postings
+
+        candidates = None
+        for start in range(len(pattern) - NGRAM + 1):
+            found = postings.get(pattern[start:start + NGRAM])
+            if not found:
+                return ()
+            candidates = set(found) if candidates is None else candidates & found
+        return candidates
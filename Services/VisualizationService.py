@@ -1,10 +1,14 @@
 import pandas as pd
 import numpy as np
+from Services.OutOfCoreService import MemmapMatrix
 
 
 class VisualizationService:
     def __init__(self, data=None, parent_ui=None):
         self.data = data  # pandas.DataFrame
+        # В режиме работы с диска гистограммы считаются порциями по матрице,
+        # а точечные и линейные графики строятся по равномерной выборке строк
+        self.matrix = data if isinstance(data, MemmapMatrix) else None
         self.parent_ui = parent_ui  # Ссылка на главное окно для вызова диалогов
         self.figure = parent_ui.figure
         self.canvas = None
@@ -14,6 +18,9 @@ class VisualizationService:
         self.canvas = canvas
 
     def plot_data(self, selected_cols, plot_type):
+        if self.matrix is not None and plot_type not in ("Гистограмма", "Круговая диаграмма"):
+            self.data = self.matrix.sample()
+
         if plot_type == "Гистограмма":
             self._plot_histogram(selected_cols)
         elif plot_type == "Диаграмма рассеяния по осям":
@@ -32,6 +39,14 @@ class VisualizationService:
     def _plot_histogram(self, selected_cols):
         """Построение гистограмм"""
         ax = self.figure.add_subplot(111)
+        if self.matrix is not None:
+            for col in selected_cols:
+                counts, edges = self.matrix.histogram(col, bins=15)
+                ax.stairs(counts, edges, fill=True, alpha=0.5, label=col)
+            ax.legend()
+            ax.set_title("Гистограммы числовых данных")
+            return
+
         num_cols = [col for col in selected_cols if pd.api.types.is_numeric_dtype(self.data[col])]
 
         if num_cols:
@@ -87,19 +102,21 @@ class VisualizationService:
 
         for idx, col in enumerate(selected_cols):
             ax = self.figure.add_subplot(1, n, idx + 1)
-            if pd.api.types.is_numeric_dtype(self.data[col]):
-                unique_values = self.data[col].dropna().unique()
+            # Из матрицы на диске читается только нужный столбец
+            series = pd.Series(np.asarray(self.matrix.column(col))) if self.matrix is not None else self.data[col]
+            if pd.api.types.is_numeric_dtype(series):
+                unique_values = series.dropna().unique()
                 if set(unique_values).issubset({0, 1}):
-                    counts = self.data[col].value_counts()
+                    counts = series.value_counts()
                     labels = ['0', '1']
                     ax.pie(counts, labels=labels, autopct='%1.1f%%')
                     ax.set_title(f"{col} (0/1)")
                 else:
-                    counts, bins = np.histogram(self.data[col].dropna(), bins=5)
+                    counts, bins = np.histogram(series.dropna(), bins=5)
                     labels = [f"{bins[i]:.1f}-{bins[i + 1]:.1f}" for i in range(len(counts))]
                     ax.pie(counts, labels=labels, autopct='%1.1f%%')
                     ax.set_title(f"{col}")
             else:
-                counts = self.data[col].value_counts()
+                counts = series.value_counts()
                 ax.pie(counts, labels=counts.index, autopct='%1.1f%%')
                 ax.set_title(f"{col}")
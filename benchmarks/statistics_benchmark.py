@@ -0,0 +1,40 @@
+"""Сравнение расчета статистики через pandas и однопроходного ядра моментов.
+
+Запуск из корня проекта: python -m benchmarks.statistics_benchmark [строк ...]
+"""
+import sys
+import numpy as np
+import pandas as pd
+from EditingMode.OsteoartritModel import COLUMN_DTYPES, BINARY_COLUMNS
+from Services.StatisticsService import StatisticsService
+
+ROW_COUNTS = [10000, 100000, 1000000]
+MISSING_SHARE = 0.02
+
+
+def make_dataset(n_rows, seed=0) -> pd.DataFrame:
+    """Синтетический набор по схеме модели: бинарные признаки, баллы и антропометрия"""
+    rng = np.random.default_rng(seed)
+    data = {}
+    for col, dtype in COLUMN_DTYPES.items():
+        if col in BINARY_COLUMNS:
+            values = rng.integers(0, 2, n_rows)
+        elif dtype.startswith("float"):
+            values = rng.normal(170 if col == "Рост" else 70, 12, n_rows)
+            values[rng.random(n_rows) < MISSING_SHARE] = np.nan
+        else:
+            values = rng.integers(0, 90, n_rows)
+        data[col] = values.astype(dtype)
+    return pd.DataFrame(data)
+
+
+def main(row_counts):
+    print(f"{'строк':>10} {'pandas, с':>10} {'ядро, с':>10} {'ускорение':>10} {'расхождение':>12}")
+    for n_rows in row_counts:
+        result = StatisticsService(make_dataset(n_rows)).benchmark()
+        print(f"{n_rows:>10} {result['pandas']:>10.4f} {result['fused']:>10.4f} "
+              f"{result['pandas'] / result['fused']:>9.1f}x {result['max_diff']:>12.3g}")
+
+
+if __name__ == "__main__":
+    main([int(arg) for arg in sys.argv[1:]] or ROW_COUNTS)
@@ -0,0 +1,43 @@
+import numpy as np
+import pandas as pd
+import pytest
+from openpyxl import load_workbook
+
+from EditingMode.OsteoartritModel import apply_schema
+from Services.DatasetLoader import DatasetLoader
+from Services.ExportService import ExportService
+
+
+@pytest.fixture
+def records():
+    return apply_schema(pd.DataFrame({
+        "Врач": [1, 2, 3],
+        "Возраст": [45, 61, 38],
+        "Рост": [170.3, 158.7, np.nan],
+        "Вес": [72.3, 64.1, 80.9],
+        "ИМТ": [24.9, 25.5, np.nan],
+    }))
+
+
+def test_excel_keeps_float32_values(records, tmp_path):
+    path = str(tmp_path / "data.xlsx")
+    ExportService(chunk_rows=2).write(records, path)
+    wb = load_workbook(path, read_only=True)
+    rows = list(wb.active.iter_rows(min_row=2, values_only=True))
+    wb.close()
+    assert rows[0][2:4] == (170.3, 72.3)
+    assert rows[2][2] is None
+
+
+@pytest.mark.parametrize("name", ["data.xlsx", "data.csv"])
+def test_load_save_load_round_trip(records, tmp_path, name):
+    loader = DatasetLoader(schema=apply_schema, replay_journal=False)
+    first = tmp_path / ("first" + name[-5:] if name.endswith("xlsx") else "first.csv")
+    ExportService().write(records, str(first))
+    loaded = loader.load(str(first))
+
+    second = str(tmp_path / name)
+    ExportService().write(loaded, second)
+    reloaded = loader.load(second)
+    pd.testing.assert_frame_equal(reloaded, loaded)
+    pd.testing.assert_frame_equal(reloaded, records, check_dtype=False)
@@ -0,0 +1,129 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from Services.FilterExpression import FilterExpression
+from Services.FilterService import FilteredDataset
+
+
+@pytest.fixture
+def df():
+    rng = np.random.default_rng(0)
+    n = 1003  # Не кратно 8: проверяет хвост упакованных масок
+    data = pd.DataFrame({
+        "Врач": rng.integers(1, 5, n).astype("int16"),
+        "Возраст": rng.integers(18, 90, n).astype("int16"),
+        "Рост": rng.normal(170, 10, n).astype("float32"),
+        "ИМТ<25": rng.integers(0, 2, n).astype("int8"),
+        "Стрии": rng.integers(0, 2, n).astype(float),
+        "in": rng.integers(0, 2, n).astype("int8"),
+        "Диагноз": rng.choice(["Артроз", "артрит", "Норма", None], n),
+    })
+    data.loc[rng.random(n) < 0.1, "Рост"] = np.nan
+    data.loc[rng.random(n) < 0.1, "Стрии"] = np.nan
+    return data
+
+
+@pytest.mark.parametrize("text", [
+    "",
+    "Возраст >",
+    "(Возраст > 1",
+    "[Возраст > 5",
+    "Врач IN (1, 2",
+    "Возраст BETWEEN 30",
+    "Рост NOT IS NULL",
+    "in = 1",
+    "Возраст > 1 Врач",
+    "Возраст ~ 1",
+])
+def test_parse_errors(text):
+    with pytest.raises(ValueError):
+        FilterExpression(text)
+
+
+def test_missing_column(df):
+    with pytest.raises(ValueError, match="Нет"):
+        FilterExpression("Нет = 1").evaluate(df)
+
+
+def test_keyword_column_in_brackets(df):
+    mask = FilterExpression("[in] = 1").evaluate(df)
+    assert np.array_equal(mask, (df["in"] == 1).to_numpy())
+
+
+def test_between_inside_and_chain(df):
+    expression = FilterExpression("Возраст BETWEEN 30 AND 50 AND Врач = 1")
+    assert expression.tree[0] == 'and' and len(expression.tree[1]) == 2
+    expected = df["Возраст"].between(30, 50) & (df["Врач"] == 1)
+    assert np.array_equal(expression.evaluate(df), expected.to_numpy())
+
+
+def test_is_not_null(df):
+    mask = FilterExpression("Рост IS NOT NULL").evaluate(df)
+    assert np.array_equal(mask, df["Рост"].notna().to_numpy())
+    assert np.array_equal(mask, FilterExpression("NOT Рост IS NULL").evaluate(df))
+
+
+@pytest.mark.parametrize("text", ["Стрии != 0", "NOT Стрии = 0", "NOT Рост > 170"])
+def test_negation_includes_nulls(df, text):
+    column = text.split()[-3]
+    plain = FilterExpression(text).evaluate(df)
+    assert plain[df[column].isna().to_numpy()].all()
+    assert np.array_equal(FilteredDataset(df).expression_mask(FilterExpression(text)), plain)
+
+
+def test_quoted_string_with_apostrophe():
+    assert FilterExpression("[Диагноз] CONTAINS 'it''s'").tree == ('contains', 'Диагноз', "it's")
+
+
+EXPRESSIONS = [
+    "[ИМТ<25] = 1",
+    "[ИМТ<25] != 1",
+    "NOT Стрии = 0",
+    "Стрии IS NULL",
+    "Стрии IN (0, 1)",
+    "[ИМТ<25] = 1 AND (Стрии = 0 OR [in] = 1)",
+    "Возраст > 40",
+    "Возраст <= 40.5",
+    "Рост >= 170 AND Рост < 180",
+    "Возраст BETWEEN 30 AND 50 AND Врач = 1",
+    "NOT Рост BETWEEN 160 AND 175",
+    "Врач IN (1, 3) OR Рост IS NULL",
+    "Диагноз CONTAINS 'арт'",
+    "Диагноз CONTAINS 'арт' AND NOT [ИМТ<25] = 1 AND Возраст > 60",
+    "Врач = 7",
+]
+
+
+@pytest.mark.parametrize("text", EXPRESSIONS)
+def test_indexed_mask_matches_plain_scan(df, text):
+    dataset = FilteredDataset(df)
+    plain = FilterExpression(text).evaluate(df)
+    indexed = dataset.expression_mask(FilterExpression(text))
+    assert np.array_equal(indexed, plain)
+    assert dataset.expression_count(FilterExpression(text)) == np.count_nonzero(plain)
+
+
+@pytest.mark.parametrize("text", EXPRESSIONS)
+def test_count_under_existing_filter(df, text):
+    dataset = FilteredDataset(df)
+    dataset.apply((df["Врач"] != 2).to_numpy(), "Врач != 2")
+    plain = FilterExpression(text).evaluate(df)
+    assert dataset.expression_count(FilterExpression(text)) == np.count_nonzero(plain & dataset.mask)
+
+
+@pytest.mark.parametrize("column, operator, value", [
+    ("ИМТ<25", "==", "1"),
+    ("ИМТ<25", "!=", "1"),
+    ("Возраст", ">", "40"),
+    ("Возраст", "==", "40"),
+    ("Рост", "<=", "170.5"),
+])
+def test_condition_mask_matches_plain_scan(df, column, operator, value):
+    expected = FilterExpression(f"[{column}] {operator} {value}").evaluate(df)
+    assert np.array_equal(FilteredDataset(df).condition_mask(column, operator, value), expected)
+
+
+def test_contains_condition_ignores_case(df):
+    expected = df["Диагноз"].astype(str).str.contains("арт", case=False, regex=False).to_numpy()
+    assert np.array_equal(FilteredDataset(df).condition_mask("Диагноз", "содержит", "АРТ"), expected)
@@ -0,0 +1,22 @@
+import numpy as np
+import pandas as pd
+
+from EditingMode.OsteoartritModel import apply_schema, exact_floats
+
+
+def test_exact_floats_restores_decimal_values():
+    values = pd.Series([170.3, 72.3, np.nan, 24.9], dtype="float32")
+    result = exact_floats(values)
+    assert result.dtype == np.float64
+    assert result.iloc[0] == 170.3 and result.iloc[1] == 72.3 and result.iloc[3] == 24.9
+    assert np.isnan(result.iloc[2])
+
+
+def test_exact_floats_keeps_other_columns():
+    df = apply_schema(pd.DataFrame({"Рост": [170.3], "Врач": [1], "Диагноз": ["Артроз"]}))
+    assert df["Рост"].dtype == np.float32
+    result = exact_floats(df)
+    assert result["Рост"].tolist() == [170.3]
+    assert result["Врач"].dtype == df["Врач"].dtype
+    assert result["Диагноз"].tolist() == ["Артроз"]
+    assert df["Рост"].dtype == np.float32  # Исходный DataFrame не изменяется
@@ -0,0 +1,33 @@
+import os
+
+import pandas as pd
+
+from Services import SpreadsheetReader as reader_module
+from Services.SpreadsheetReader import BENCHMARK_RUNS, SpreadsheetReader
+
+SAMPLE = os.path.join(os.path.dirname(__file__), "..", "databases", "База пациентов.xlsx")
+
+
+def test_benchmark_warms_up_each_engine(monkeypatch):
+    calls = []
+    read_excel = pd.read_excel
+
+    def counting_read(source, engine, **kwargs):
+        calls.append(engine)
+        return read_excel(source, engine=engine, **kwargs)
+
+    monkeypatch.setattr(reader_module.pd, "read_excel", counting_read)
+    assert SpreadsheetReader.benchmark(SAMPLE, "xlsx", ["openpyxl"]) == "openpyxl"
+    assert calls == ["openpyxl"] * (1 + BENCHMARK_RUNS)
+
+
+def test_failed_save_leaves_no_temporary_file(tmp_path, monkeypatch):
+    reader = SpreadsheetReader(str(tmp_path / "reader_engines.json"))
+    reader._choices = {"xlsx:0": "openpyxl"}
+
+    def failing_dump(*args, **kwargs):
+        raise OSError("disk full")
+
+    monkeypatch.setattr(reader_module.json, "dump", failing_dump)
+    reader._save_choices()
+    assert os.listdir(tmp_path) == []
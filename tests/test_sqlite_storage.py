@@ -0,0 +1,58 @@
+import sqlite3
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from EditingMode.OsteoartritModel import apply_schema
+from Services.DatasetLoader import DatasetLoader
+from Services.SqliteStorage import SqliteStorage, TABLE_NAME
+
+
+@pytest.fixture
+def records():
+    return apply_schema(pd.DataFrame({
+        "Врач": [1, 2],
+        "Рост": [170.3, np.nan],
+        "Вес": [72.3, 64.1],
+    }))
+
+
+def stored_values(db_path, column):
+    conn = sqlite3.connect(db_path)
+    try:
+        return [row[0] for row in conn.execute(f'SELECT "{column}" FROM {TABLE_NAME} ORDER BY id')]
+    finally:
+        conn.close()
+
+
+def test_write_frame_keeps_float32_values(records, tmp_path):
+    path = str(tmp_path / "data.db")
+    SqliteStorage.write_frame(records, path)
+    assert stored_values(path, "Рост") == [170.3, None]
+    assert stored_values(path, "Вес") == [72.3, 64.1]
+
+
+def test_insert_and_update_keep_float32_values(records, tmp_path):
+    path = str(tmp_path / "data.db")
+    SqliteStorage.write_frame(records.iloc[:0], path)
+    storage = SqliteStorage(path)
+    try:
+        storage.insert([np.int16(1), np.float32(170.3), np.float32(72.3)])
+        storage.insert([np.int16(2), None, np.float32(64.1)])
+        storage.update(1, [np.int16(3), np.float32(158.7), np.float32(80.9)])
+    finally:
+        storage.close()
+    assert stored_values(path, "Рост") == [170.3, 158.7]
+    assert stored_values(path, "Вес") == [72.3, 80.9]
+
+
+def test_load_save_load_round_trip(records, tmp_path):
+    loader = DatasetLoader(schema=apply_schema, replay_journal=False)
+    first = str(tmp_path / "first.db")
+    SqliteStorage.write_frame(records, first)
+    loaded = loader.load(first)
+    second = str(tmp_path / "second.db")
+    SqliteStorage.write_frame(loaded, second)
+    pd.testing.assert_frame_equal(loader.load(second), loaded)
+    assert stored_values(second, "Рост") == [170.3, None]